@@ -22,21 +22,16 @@ from src.audio.config import (
     BASELINE_CREST_RANGE,
     INTERPRETATION_RANGES
 )
-from src.utils.scoring_utils import compute_tiered_score
+from src.utils.scoring_utils import compute_tiered_score, build_interpretation_lookup, lookup_interpretation
+
+# Bucket search tables for get_interpretation, built once at import
+INTERPRETATION_LOOKUP = build_interpretation_lookup(INTERPRETATION_RANGES)
 
 def get_interpretation(metric_type, raw_value):
     """
     Get text interpretation, coaching, and label based on raw value and buckets.
     """
-    buckets = INTERPRETATION_RANGES.get(metric_type, [])
-
-    # Iterate through buckets to find the matching range
-    for bucket in buckets:
-        if raw_value <= bucket["max"]:
-            return bucket["text"], bucket["coaching"], bucket["label"]
-
-    # Fallback (should not happen with max=999)
-    return "Value out of range", "Check your settings.", "unknown"
+    return lookup_interpretation(INTERPRETATION_LOOKUP, metric_type, raw_value)
 
 def get_global_interpretation(score):
     """
@@ -17,12 +17,22 @@ from src.body.geometry import (
     compute_midplane_depth_normalized
 )
 
-def process_video(video_path, progress_callback=None):
+FEATURE_COLUMNS = [
+    "gesture_magnitude",
+    "gesture_activity",
+    "body_sway",
+    "posture_openness",
+    "wrist_depth_norm"
+]
+
+def process_video(video_path, progress_callback=None, keep_landmarks=False):
     """
     Process a video file to extract body metrics frame by frame.
 
     Args:
         video_path (str): Path to the input video file.
+        keep_landmarks (bool): Also return the pose landmarks of every frame so the
+                               debug video can be drawn without re-running Holistic.
 
     Returns:
         pd.DataFrame: DataFrame containing timestamped metrics:
@@ -30,6 +40,8 @@ def process_video(video_path, progress_callback=None):
                       - gesture_activity
                       - body_sway
                       - posture_openness
+        If keep_landmarks, a (df, pose_landmarks) tuple where pose_landmarks holds one
+        serialized NormalizedLandmarkList (or None when no pose was found) per frame.
     """
     # Initialize MediaPipe Holistic
     mp_holistic = mp.solutions.holistic
@@ -49,7 +61,14 @@ def process_video(video_path, progress_callback=None):
         fps = 30.0  # Fallback to 30fps if detection fails
     frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-    features = []
+    # Per-frame metrics are written straight into preallocated columns
+    # (one row per frame) instead of accumulating a dict per frame.
+    # Features are float32: MediaPipe landmarks are float32 to begin with, so a
+    # float64 buffer only doubles memory. Timestamps stay float64 for the second cut.
+    timestamps = np.full(max(frame_count, 0), np.nan)
+    features = np.full((max(frame_count, 0), len(FEATURE_COLUMNS)), np.nan, dtype=np.float32)
+    n_frames = 0
+    pose_landmarks = [] if keep_landmarks else None
 
     prev_L_wr = None
     prev_R_wr = None
@@ -75,6 +94,11 @@ def process_video(video_path, progress_callback=None):
         posture_openness = np.nan
         wrist_depth_norm = np.nan
 
+        if keep_landmarks:
+            pose_landmarks.append(
+                results.pose_landmarks.SerializeToString() if results.pose_landmarks else None
+            )
+
         if results.pose_landmarks:
             lm = results.pose_landmarks.landmark
 
@@ -121,19 +145,26 @@ def process_video(video_path, progress_callback=None):
             # ----- METRIC 5 : Wrist Depth (midplane-normalized for posture scoring) -----
             wrist_depth_norm = compute_midplane_depth_normalized(lm)
 
-        features.append({
-            "timestamp": timestamp,
-            "gesture_magnitude": gesture_magnitude,
-            "gesture_activity": gesture_activity,
-            "body_sway": body_sway,
-            "posture_openness": posture_openness,
-            "wrist_depth_norm": wrist_depth_norm
-        })
+        timestamps[idx] = timestamp
+        features[idx] = (
+            gesture_magnitude,
+            gesture_activity,
+            body_sway,
+            posture_openness,
+            wrist_depth_norm
+        )
+        n_frames = idx + 1
 
     cap.release()
     holistic.close()
 
-    df = pd.DataFrame(features).set_index("timestamp")
+    df = pd.DataFrame(
+        features[:n_frames],
+        columns=FEATURE_COLUMNS,
+        index=pd.Index(timestamps[:n_frames], name="timestamp")
+    )
     df["second"] = df.index.astype(int)
 
+    if keep_landmarks:
+        return df, pose_landmarks
     return df
@@ -41,7 +41,10 @@ def run_body_pipeline(video_path, output_dir=None, progress_callback=None):
     # 1. Extraction
     print("--- Step 1: Extraction ---")
     print("--- Step 1: Extraction ---")
-    raw_df = process_video(str(video_path), progress_callback=progress_callback)
+    # Pose landmarks are kept so the debug video does not re-run Holistic
+    raw_df, pose_landmarks = process_video(
+        str(video_path), progress_callback=progress_callback, keep_landmarks=True
+    )
 
     # 2. Scoring
     print("--- Step 2: Scoring ---")
@@ -63,6 +66,10 @@ def run_body_pipeline(video_path, output_dir=None, progress_callback=None):
     # Compute Scores & Timeline
     scores, window_df, timeline_smooth_df, raw_1s_df = compute_scores(raw_df)
 
+    if "error" in scores:
+        print(f"⚠️ Body scoring skipped: {scores['error']}")
+        return scores
+
     # Save Processed Metrics (Windowed/Smoothed)
     metrics_path = output_dir / "metrics_body.csv"
     window_df.to_csv(metrics_path, index=False)
@@ -89,7 +96,7 @@ def run_body_pipeline(video_path, output_dir=None, progress_callback=None):
     if progress_callback:
         progress_callback(1.0, "Processing - Body debug file creation")
     debug_video_path = output_dir / "debug_pose.mp4"
-    create_debug_video(str(video_path), str(debug_video_path))
+    create_debug_video(str(video_path), str(debug_video_path), pose_landmarks=pose_landmarks)
     print(f"✅ Saved debug video to: {debug_video_path}")
 
     print("🎉 Body Pipeline completed successfully!")
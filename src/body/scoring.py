@@ -26,61 +26,39 @@ from src.body.config import (
     POSTURE_SCORE_NEUTRAL,
     POSTURE_SCORE_CLOSED
 )
-from src.utils.temporal import project_windows_to_seconds
-from src.utils.scoring_utils import compute_tiered_score
-
-def compute_change_labels(values, metric_id):
-    """
-    Compute window-to-window deltas and labels for temporal stability analysis.
-    """
-    values = np.asarray(values, dtype=float)
-    if len(values) < 2:
-        return np.array([]), []
+from src.utils.temporal import aggregate_per_second, project_window_values
+from src.utils.scoring_utils import (
+    build_interpretation_lookup,
+    lookup_interpretation,
+    build_tiered_lookup,
+    build_change_bounds,
+    score_windows,
+    memoize_by_frame
+)
 
-    deltas = np.abs(np.diff(values))
-    thresholds = CHANGE_THRESHOLDS.get(metric_id, {"stable": 0.1, "shifting": 0.3})
+# Bucket search tables for get_interpretation, built once at import
+INTERPRETATION_LOOKUP = build_interpretation_lookup(INTERPRETATION_RANGES)
 
-    labels = []
-    for d in deltas:
-        if d <= thresholds["stable"]:
-            labels.append("stable")
-        elif d <= thresholds["shifting"]:
-            labels.append("shifting")
-        else:
-            labels.append("erratic")
+# Tiered scoring bucket arrays per metric, built once at import
+TIERED_LOOKUP = build_tiered_lookup(INTERPRETATION_RANGES)
 
-    return deltas, labels
+# (stable, shifting) bounds per metric, resolved once at import
+CHANGE_BOUNDS = build_change_bounds(CHANGE_THRESHOLDS)
 
-def sliding_windows(series, window=5):
-    """
-    Apply a sliding window to a pandas Series.
-    Returns a DataFrame with start_sec, end_sec, and mean value for the window.
-    """
-    rows = []
-    seconds = series.index.values
+# Posture score per state: 0 = open, 1 = neutral, 2 = closed
+POSTURE_STATE_SCORES = np.array([POSTURE_SCORE_OPEN, POSTURE_SCORE_NEUTRAL, POSTURE_SCORE_CLOSED])
 
-    for start in seconds:
-        end = start + window
-        win = series.loc[start:end]
-
-        if len(win) == window + 1:
-            rows.append({
-                "start_sec": start,
-                "end_sec": end,
-                "value": win.mean()
-            })
-
-    return pd.DataFrame(rows)
+# (per-second column, metric id) pairs scored over sliding windows, in output column order
+WINDOW_METRICS = [
+    (metric, metric)
+    for metric in ["gesture_magnitude", "gesture_activity", "gesture_stability", "body_sway", "posture_openness"]
+]
 
 def get_interpretation(metric_type, raw_value):
     """
     Get text interpretation, coaching, and label based on raw value and buckets.
     """
-    buckets = INTERPRETATION_RANGES.get(metric_type, [])
-    for bucket in buckets:
-        if raw_value <= bucket["max"]:
-            return bucket["text"], bucket["coaching"], bucket["label"]
-    return "Value out of range", "Check your settings.", "unknown"
+    return lookup_interpretation(INTERPRETATION_LOOKUP, metric_type, raw_value)
 
 def get_global_interpretation(score):
     ranges = INTERPRETATION_RANGES.get("body_global_score", [])
@@ -89,6 +67,7 @@ def get_global_interpretation(score):
             return text
     return "Score out of range"
 
+@memoize_by_frame()
 def compute_scores(raw_df):
     """
     Compute aggregated scores from raw frame data.
@@ -98,38 +77,44 @@ def compute_scores(raw_df):
 
     Returns:
         tuple: (scores_dict, window_df, timeline_1s, raw_1s_df)
+               Videos too short for a single window return an error dict and empty frames.
     """
+    # Short-circuit before any aggregation: a 5s window needs 6 distinct seconds
+    if raw_df["second"].nunique() < 6:
+        return {
+            "error": "Video too short for analysis (needs > 5 seconds)"
+        }, pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
     # 1. Aggregate per second
-    mag_1s = raw_df.groupby("second")["gesture_magnitude"].mean().fillna(0)
-    act_1s = raw_df.groupby("second")["gesture_activity"].mean().fillna(0)
-    sway_1s = raw_df.groupby("second")["body_sway"].mean().fillna(0)
+    # Seconds are small integers, so every column is reduced with np.bincount
+    # instead of a pandas groupby. Per-frame features may arrive as float32;
+    # they are accumulated in float64.
+    # Gesture Stability: Variance of activity within the second
+    per_second = aggregate_per_second(
+        raw_df["second"].to_numpy(),
+        gesture_magnitude=(raw_df["gesture_magnitude"].to_numpy(), "mean"),
+        gesture_activity=(raw_df["gesture_activity"].to_numpy(), "mean"),
+        gesture_stability=(raw_df["gesture_activity"].to_numpy(), "var"),
+        body_sway=(raw_df["body_sway"].to_numpy(), "mean"),
+        wrist_depth_norm=(raw_df["wrist_depth_norm"].to_numpy(), "mean")
+    ).fillna(0)
+    mag_1s = per_second["gesture_magnitude"]
+    act_1s = per_second["gesture_activity"]
+    stab_1s = per_second["gesture_stability"]
+    sway_1s = per_second["body_sway"]
 
     # Posture Openness Logic (Wrist Position + Gesture Magnitude)
     # We need both magnitude and wrist depth to calculate the score
-    wrist_1s = raw_df.groupby("second")["wrist_depth_norm"].mean().fillna(0)
-
-    # Helper to calculate posture score per second
-    def calc_posture_score(row):
-        mag = row["gesture_magnitude"]
-        wrist = row["wrist_depth_norm"]
-
-        # Logic:
-        # 1. If gesturing widely (mag > threshold), it's OPEN
-        if mag > BASELINE_ARMS_CLOSE_THRESHOLD:
-            return POSTURE_SCORE_OPEN
-        # 2. If arms close, check wrist depth
-        # Negative depth = forward (defensive barrier) -> CLOSED
-        elif wrist < BASELINE_WRIST_FORWARD_DEPTH:
-            return POSTURE_SCORE_CLOSED
-        # 3. Otherwise (arms close but wrists neutral/behind) -> NEUTRAL
-        else:
-            return POSTURE_SCORE_NEUTRAL
+    wrist_1s = per_second["wrist_depth_norm"]
 
-    temp_posture_df = pd.DataFrame({"gesture_magnitude": mag_1s, "wrist_depth_norm": wrist_1s})
-    posture_1s = temp_posture_df.apply(calc_posture_score, axis=1)
-
-    # Gesture Stability: Variance of activity within the second
-    stab_1s = raw_df.groupby("second")["gesture_activity"].var().fillna(0)
+    # Posture state per second, resolved through a lookup table instead of a per-row branch:
+    # 1. If gesturing widely (mag > threshold), it's OPEN
+    # 2. If arms close and wrists forward (negative depth = defensive barrier) -> CLOSED
+    # 3. Otherwise (arms close but wrists neutral/behind) -> NEUTRAL
+    arms_close = mag_1s.values <= BASELINE_ARMS_CLOSE_THRESHOLD
+    wrists_forward = wrist_1s.values < BASELINE_WRIST_FORWARD_DEPTH
+    posture_state = arms_close.astype(np.intp) + (arms_close & wrists_forward)
+    posture_1s = pd.Series(POSTURE_STATE_SCORES[posture_state], index=mag_1s.index)
 
     # Build 1-second raw timeline DataFrame
     raw_1s_df = pd.DataFrame({
@@ -141,147 +126,47 @@ def compute_scores(raw_df):
         "posture_openness": posture_1s.values # This is now the 0.2/0.6/1.0 score
     })
 
-    # 2. Sliding Windows (5s)
-    df_mag_5s = sliding_windows(mag_1s)
-    df_act_5s = sliding_windows(act_1s)
-    df_stab_5s = sliding_windows(stab_1s)
-    df_sway_5s = sliding_windows(sway_1s)
-    df_posture_5s = sliding_windows(posture_1s)
+    # 2-6. Sliding Windows (5s), Tiered Parabolic scores and window deltas
+    # Posture Openness value is already 0.2/0.6/1.0 (or averaged over 5s, e.g. 0.8)
+    window_df, window_scores = score_windows(
+        raw_1s_df, WINDOW_METRICS, TIERED_LOOKUP, CHANGE_BOUNDS, score_suffix="score"
+    )
 
     # Handle short videos
-    if df_mag_5s.empty:
+    if window_scores is None:
         return {
             "error": "Video too short for analysis (needs > 5 seconds)"
         }, pd.DataFrame(), pd.DataFrame(), raw_1s_df
 
-    # 3. Scoring Logic (Tiered Parabolic)
-
-    # Gesture Magnitude
-    df_mag_5s["comm_score"] = df_mag_5s["value"].apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["gesture_magnitude"])
-    )
-
-    # Gesture Activity
-    df_act_5s["comm_score"] = df_act_5s["value"].apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["gesture_activity"])
-    )
-
-    # Gesture Stability
-    df_stab_5s["comm_score"] = df_stab_5s["value"].apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["gesture_stability"])
-    )
-
-    # Body Sway
-    df_sway_5s["comm_score"] = df_sway_5s["value"].apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["body_sway"])
-    )
-
-    # Posture Openness
-    # Value is already 0.2/0.6/1.0 (or averaged over 5s, e.g. 0.8)
-    # Config buckets are 0.3, 0.7, 999
-    df_posture_5s["comm_score"] = df_posture_5s["value"].apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["posture_openness"])
-    )
-
-    # 4. Global Score
-    global_score = (
-        df_mag_5s["comm_score"].mean() +
-        df_act_5s["comm_score"].mean() +
-        df_stab_5s["comm_score"].mean() +
-        df_sway_5s["comm_score"].mean() +
-        df_posture_5s["comm_score"].mean()
-    ) / 5.0
-
-    # 5. Window Deltas
-    for df, metric in [
-        (df_mag_5s, "gesture_magnitude"),
-        (df_act_5s, "gesture_activity"),
-        (df_stab_5s, "gesture_stability"),
-        (df_sway_5s, "body_sway"),
-        (df_posture_5s, "posture_openness")
-    ]:
-        deltas, labels = compute_change_labels(df["value"].values, metric)
-        df["delta"] = np.nan
-        df["change_label"] = ""
-        if len(deltas) > 0:
-            df.iloc[:-1, df.columns.get_loc("delta")] = deltas
-            df.iloc[:-1, df.columns.get_loc("change_label")] = labels
-
-    # 6. Prepare Outputs
-
-    # Rename columns
-    df_mag_5s = df_mag_5s.rename(columns={"value": "gesture_magnitude_val", "comm_score": "gesture_magnitude_score", "delta": "gesture_magnitude_delta", "change_label": "gesture_magnitude_change_label"})
-    df_act_5s = df_act_5s.rename(columns={"value": "gesture_activity_val", "comm_score": "gesture_activity_score", "delta": "gesture_activity_delta", "change_label": "gesture_activity_change_label"})
-    df_stab_5s = df_stab_5s.rename(columns={"value": "gesture_stability_val", "comm_score": "gesture_stability_score", "delta": "gesture_stability_delta", "change_label": "gesture_stability_change_label"})
-    df_sway_5s = df_sway_5s.rename(columns={"value": "body_sway_val", "comm_score": "body_sway_score", "delta": "body_sway_delta", "change_label": "body_sway_change_label"})
-    df_posture_5s = df_posture_5s.rename(columns={"value": "posture_openness_val", "comm_score": "posture_openness_score", "delta": "posture_openness_delta", "change_label": "posture_openness_change_label"})
-
-    # Merge
-    window_df = df_mag_5s.merge(df_act_5s, on=["start_sec", "end_sec"])\
-                         .merge(df_stab_5s, on=["start_sec", "end_sec"])\
-                         .merge(df_sway_5s, on=["start_sec", "end_sec"])\
-                         .merge(df_posture_5s, on=["start_sec", "end_sec"])
+    # 7. Global Score & Interpretations
+    # Per-metric means of the window values and scores, taken in one pass each
+    # (one metric per contiguous row) and unboxed to Python floats with tolist()
+    val_columns = [f"{column}_val" for column, _ in WINDOW_METRICS]
+    val_means = np.ascontiguousarray(window_df[val_columns].to_numpy().T).mean(axis=1).tolist()
+    score_means = window_scores.mean(axis=1).tolist()
 
+    global_score = sum(score_means) / 5.0
     window_df["body_global_score"] = global_score
 
-    # 7. Global Interpretations
-    mag_mean = df_mag_5s["gesture_magnitude_val"].mean()
-    act_mean = df_act_5s["gesture_activity_val"].mean()
-    stab_mean = df_stab_5s["gesture_stability_val"].mean()
-    sway_mean = df_sway_5s["body_sway_val"].mean()
-    posture_mean = df_posture_5s["posture_openness_val"].mean()
-
-    # Scores (mean of window scores)
-    mag_score = df_mag_5s["gesture_magnitude_score"].mean()
-    act_score = df_act_5s["gesture_activity_score"].mean()
-    stab_score = df_stab_5s["gesture_stability_score"].mean()
-    sway_score = df_sway_5s["body_sway_score"].mean()
-    posture_score = df_posture_5s["posture_openness_score"].mean()
-
-    interp_mag, coach_mag, label_mag = get_interpretation("gesture_magnitude", mag_mean)
-    interp_act, coach_act, label_act = get_interpretation("gesture_activity", act_mean)
-    interp_stab, coach_stab, label_stab = get_interpretation("gesture_stability", stab_mean)
-    interp_sway, coach_sway, label_sway = get_interpretation("body_sway", sway_mean)
-    interp_posture, coach_posture, label_posture = get_interpretation("posture_openness", posture_mean)
-
     scores = {
-        "body_global_score": float(global_score),
-        "body_global_interpretation": get_global_interpretation(global_score),
-
-        "gesture_magnitude_score": float(mag_score),
-        "gesture_magnitude_val": float(mag_mean),
-        "gesture_magnitude_interpretation": interp_mag,
-        "gesture_magnitude_coaching": coach_mag,
-        "gesture_magnitude_label": label_mag,
-
-        "gesture_activity_score": float(act_score),
-        "gesture_activity_val": float(act_mean),
-        "gesture_activity_interpretation": interp_act,
-        "gesture_activity_coaching": coach_act,
-        "gesture_activity_label": label_act,
-
-        "gesture_stability_score": float(stab_score),
-        "gesture_stability_val": float(stab_mean),
-        "gesture_stability_interpretation": interp_stab,
-        "gesture_stability_coaching": coach_stab,
-        "gesture_stability_label": label_stab,
-
-        "body_sway_score": float(sway_score),
-        "body_sway_val": float(sway_mean),
-        "body_sway_interpretation": interp_sway,
-        "body_sway_coaching": coach_sway,
-        "body_sway_label": label_sway,
-
-        "posture_openness_score": float(posture_score),
-        "posture_openness_val": float(posture_mean),
-        "posture_openness_interpretation": interp_posture,
-        "posture_openness_coaching": coach_posture,
-        "posture_openness_label": label_posture
+        "body_global_score": global_score,
+        "body_global_interpretation": get_global_interpretation(global_score)
     }
+    for (_, metric), val_mean, score_mean in zip(WINDOW_METRICS, val_means, score_means):
+        interpretation, coaching, label = get_interpretation(metric, val_mean)
+        scores[f"{metric}_score"] = score_mean
+        scores[f"{metric}_val"] = val_mean
+        scores[f"{metric}_interpretation"] = interpretation
+        scores[f"{metric}_coaching"] = coaching
+        scores[f"{metric}_label"] = label
 
     # Project Timeline
     cols_to_project = [c for c in window_df.columns if "_val" in c or "_score" in c or "_delta" in c]
-    projection_input = window_df[["start_sec", "end_sec"] + cols_to_project]
-    timeline_1s = project_windows_to_seconds(projection_input)
+    timeline_1s = project_window_values(
+        window_df["start_sec"].to_numpy(),
+        window_df["end_sec"].to_numpy(),
+        window_df[cols_to_project].to_numpy(dtype=np.float64),
+        cols_to_project
+    )
 
     return scores, window_df, timeline_1s, raw_1s_df
@@ -4,11 +4,11 @@ Generates a debug video with MediaPipe Pose skeleton and custom colored keypoint
 """
 
 import cv2
+import numpy as np
 import mediapipe as mp
-import os
-import subprocess
-import imageio_ffmpeg
+from mediapipe.framework.formats import landmark_pb2
 from tqdm import tqdm
+from src.utils.video_io import read_frames, FrameWriter, open_h264_writer
 from src.body.config import (
     POSE_POINTS,
     COLOR_SHOULDERS,
@@ -16,98 +16,119 @@ from src.body.config import (
     COLOR_WRISTS
 )
 
-def create_debug_video(video_path, output_path):
-    """
-    Process the video again to draw pose landmarks and save a debug video.
+# Keypoints drawn on top of the skeleton, in draw order: (landmark index, radius, color)
+KEYPOINT_STYLES = (
+    [(i, 5, COLOR_SHOULDERS) for i in POSE_POINTS["shoulders"]] +
+    [(i, 5, COLOR_HIPS) for i in POSE_POINTS["hips"]] +
+    [(i, 6, COLOR_WRISTS) for i in POSE_POINTS["wrists"]]
+)
+KEYPOINT_IDX = [i for i, _, _ in KEYPOINT_STYLES]
 
-    Args:
-        video_path (str): Path to the input video.
-        output_path (str): Path to save the output video.
+def _draw_video(video_path, out, holistic, pose_landmarks):
+    """
+    Draw the pose of every frame of video_path and write it to out (a FrameWriter).
     """
-    print(f"Generating debug video: {output_path}")
-
     mp_holistic = mp.solutions.holistic
     mp_drawing = mp.solutions.drawing_utils
 
-    holistic = mp_holistic.Holistic(
-        static_image_mode=False,
-        model_complexity=1,
-        enable_segmentation=False,
-        refine_face_landmarks=False
-    )
-
     cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"❌ Error loading video: {video_path}")
-
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-    # Video writer
-    out = cv2.VideoWriter(
-        output_path,
-        cv2.VideoWriter_fourcc(*'mp4v'),
-        fps,
-        (width, height)
-    )
-
-    for _ in tqdm(range(frame_count), desc="Generating Video"):
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = holistic.process(rgb)
-
-        annotated = frame.copy()
+    # Frames are decoded ahead on a background thread
+    frames = read_frames(cap, frame_count)
+    for idx, frame in enumerate(tqdm(frames, total=frame_count, desc="Generating Video")):
+        if holistic is not None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            landmarks = holistic.process(rgb).pose_landmarks
+        elif idx < len(pose_landmarks) and pose_landmarks[idx] is not None:
+            landmarks = landmark_pb2.NormalizedLandmarkList.FromString(pose_landmarks[idx])
+        else:
+            landmarks = None
+
+        # cap.read() hands back a fresh frame each time, so draw on it directly
+        annotated = frame
         h, w, _ = frame.shape
 
-        if results.pose_landmarks:
-            lm = results.pose_landmarks.landmark
+        if landmarks:
+            lm = landmarks.landmark
 
             # ---- Custom colored keypoints ----
-            for i in POSE_POINTS["shoulders"]:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 5, COLOR_SHOULDERS, -1)
-            for i in POSE_POINTS["hips"]:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 5, COLOR_HIPS, -1)
-            for i in POSE_POINTS["wrists"]:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 6, COLOR_WRISTS, -1)
+            # Pixel coords for all keypoints at once (truncated like int())
+            points = (np.array([(lm[i].x, lm[i].y) for i in KEYPOINT_IDX]) * (w, h)).astype(int).tolist()
+            for (x, y), (_, radius, color) in zip(points, KEYPOINT_STYLES):
+                cv2.circle(annotated, (x, y), radius, color, -1)
 
             # ---- Full body skeleton (NO face) ----
             mp_drawing.draw_landmarks(
                 annotated,
-                results.pose_landmarks,
+                landmarks,
                 mp_holistic.POSE_CONNECTIONS
             )
 
         out.write(annotated)
 
     cap.release()
-    out.release()
-    holistic.close()
 
-    # Convert to H.264 for browser compatibility
-    print("🔄 Converting to H.264...")
-    temp_output = output_path + ".temp.mp4"
-    if os.path.exists(output_path):
-        os.rename(output_path, temp_output)
+def _draw_or_abort(video_path, out, holistic, pose_landmarks):
+    # Don't leave the writer thread (and the ffmpeg process) running if drawing fails
+    try:
+        _draw_video(video_path, out, holistic, pose_landmarks)
+    except BaseException:
+        out.abort()
+        raise
+
+def create_debug_video(video_path, output_path, pose_landmarks=None):
+    """
+    Draw pose landmarks on the video and save a debug video.
+
+    The video is encoded to H.264 in a single ffmpeg pass. If that fails, it is
+    drawn again and written as mp4v, so a playable debug video is always left.
+
+    Args:
+        video_path (str): Path to the input video.
+        output_path (str): Path to save the output video.
+        pose_landmarks (list, optional): Per-frame serialized landmarks from
+            process_video(..., keep_landmarks=True). When given, Holistic is not
+            run again; otherwise the video is processed a second time.
+    """
+    print(f"Generating debug video: {output_path}")
+
+    holistic = None
+    if pose_landmarks is None:
+        holistic = mp.solutions.holistic.Holistic(
+            static_image_mode=False,
+            model_complexity=1,
+            enable_segmentation=False,
+            refine_face_landmarks=False
+        )
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"❌ Error loading video: {video_path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
 
+    try:
+        # H.264 video writer (single ffmpeg pass, for browser compatibility), fed from a
+        # background thread while the next frame is drawn
+        out = FrameWriter(open_h264_writer(output_path, fps, width, height))
+        _draw_or_abort(video_path, out, holistic, pose_landmarks)
         try:
-            ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
-            subprocess.run([
-                ffmpeg_exe, "-y", "-i", temp_output,
-                "-vcodec", "libx264", "-pix_fmt", "yuv420p",
-                "-crf", "23",
-                output_path
-            ], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            os.remove(temp_output)
-            print("✅ Converted to H.264.")
+            out.close()
         except Exception as e:
-            print(f"⚠️ Failed to convert to H.264: {e}")
-            # Restore original if conversion fails
-            if os.path.exists(temp_output):
-                os.rename(temp_output, output_path)
+            print(f"⚠️ Failed to encode H.264 debug video, writing mp4v instead: {e}")
+            if holistic is not None:
+                holistic.reset()
+            out = FrameWriter(cv2.VideoWriter(
+                output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height)
+            ))
+            _draw_or_abort(video_path, out, holistic, pose_landmarks)
+            out.close()
+    finally:
+        if holistic is not None:
+            holistic.close()
 
     print("✅ Debug video saved.")
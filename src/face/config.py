@@ -29,6 +29,15 @@ COLOR_GAZE   = (0,   255, 255) # Yellow
 COLOR_EXP    = (0,   255, 0)   # Green
 COLOR_SMILE  = (0,   0,   255) # Red
 
+# Landmarks drawn on the debug video, in draw order: (landmarks, radius, color)
+DEBUG_POINT_GROUPS = [
+    (HEAD_POINTS, 3, COLOR_HEAD),
+    (GAZE_POINTS, 3, COLOR_GAZE),
+    (EXPRESS_POINTS, 3, COLOR_EXP),
+    (SMILE_POINTS, 4, COLOR_SMILE)
+]
+DEBUG_POINTS = [i for points, _, _ in DEBUG_POINT_GROUPS for i in points]
+
 
 # =========================================================
 # SCORING BASELINES (Empirically Calibrated 2025-01)
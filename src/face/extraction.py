@@ -3,27 +3,104 @@ Core extraction logic for the VERA Face Module.
 Processes video frames using MediaPipe FaceMesh and extracts raw behavioral metrics.
 """
 
+import atexit
+import multiprocessing
+import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
 import mediapipe as mp
 import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
+from src.utils.video_io import read_frames
+
+from src.face.config import DEBUG_POINTS
 from src.face.geometry import (
-    compute_head_center,
-    compute_iris_centers,
-    compute_face_center,
-    compute_smile_activation,
-    compute_inter_ocular_distance,
+    MOTION_LANDMARKS,
+    compute_face_motion,
     compute_head_tilt
 )
 
-def process_video(video_path, progress_callback=None):
+FEATURE_COLUMNS = [
+    "head_speed",
+    "gaze_dg",
+    "head_tilt",
+    "smile"
+]
+
+# One FaceMesh is reused across videos (creating one loads the model and builds
+# the graph, which dominates short clips). A solution graph is not safe to share
+# between concurrent runs, so it is guarded by a lock.
+_FACE_MESH = None
+_FACE_MESH_LOCK = threading.Lock()
+
+def _new_face_mesh():
+    return mp.solutions.face_mesh.FaceMesh(
+        refine_landmarks=True,
+        max_num_faces=1,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+@contextmanager
+def _face_mesh():
+    """
+    Yield the shared FaceMesh, reset so tracking starts fresh for a new video.
+    While another thread uses it, a temporary FaceMesh is created and closed instead.
+    """
+    global _FACE_MESH
+    if not _FACE_MESH_LOCK.acquire(blocking=False):
+        face_mesh = _new_face_mesh()
+        try:
+            yield face_mesh
+        finally:
+            face_mesh.close()
+        return
+    try:
+        if _FACE_MESH is None:
+            _FACE_MESH = _new_face_mesh()
+        else:
+            _FACE_MESH.reset()
+        yield _FACE_MESH
+    finally:
+        _FACE_MESH_LOCK.release()
+
+@atexit.register
+def close_face_mesh():
+    """
+    Close the shared FaceMesh (the next process_video creates a new one).
+    """
+    global _FACE_MESH
+    with _FACE_MESH_LOCK:
+        if _FACE_MESH is not None:
+            _FACE_MESH.close()
+            _FACE_MESH = None
+
+def _forget_face_mesh():
+    # A forked child inherits the parent's FaceMesh but not the graph threads behind
+    # it: drop it (without closing) so the child builds its own (the lock too:
+    # another thread may have held it at fork time)
+    global _FACE_MESH, _FACE_MESH_LOCK
+    _FACE_MESH = None
+    _FACE_MESH_LOCK = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_face_mesh)
+
+def process_video(video_path, progress_callback=None, stride=1, keep_landmarks=False):
     """
     Process a video file to extract face metrics frame by frame.
 
     Args:
         video_path (str): Path to the input video file.
+        stride (int): Analyze every stride-th frame only (skipped frames are not
+                      decoded). Speeds stay per second. stride=1 analyzes every frame.
+        keep_landmarks (bool): Also return the debug video landmarks of every analyzed
+                               frame so it can be drawn without re-running FaceMesh.
 
     Returns:
         pd.DataFrame: DataFrame containing timestamped metrics:
@@ -31,16 +108,18 @@ def process_video(video_path, progress_callback=None):
                       - gaze_dg (gaze direction change per sec, fps-normalized)
                       - head_tilt (nose-to-ear Y difference, positive = down)
                       - smile (activation intensity, normalized by IOD)
+        If keep_landmarks, a (df, face_landmarks) tuple where face_landmarks is a float32
+        array of the normalized (x, y) of DEBUG_POINTS per analyzed frame, shape
+        (n_frames, len(DEBUG_POINTS), 2), NaN where no face was found.
     """
-    # Initialize MediaPipe FaceMesh
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh = mp_face_mesh.FaceMesh(
-        refine_landmarks=True,
-        max_num_faces=1,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
+    if not isinstance(stride, (int, np.integer)) or stride < 1:
+        raise ValueError(f"stride must be a positive integer, got {stride!r}")
+
+    # MediaPipe FaceMesh (shared across videos)
+    with _face_mesh() as face_mesh:
+        return _process_video(face_mesh, video_path, progress_callback, stride, keep_landmarks)
 
+def _process_video(face_mesh, video_path, progress_callback, stride, keep_landmarks):
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise ValueError(f"❌ Error loading video: {video_path}")
@@ -52,83 +131,93 @@ def process_video(video_path, progress_callback=None):
     img_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     img_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 
-    features = []
-    prev_head_center = None
-    prev_gaze = None
-
-    print(f"Processing video: {video_path}")
+    # Only the landmarks the metrics need are copied per frame, into one preallocated
+    # buffer; head speed, gaze change and smile are then computed for all frames at once.
+    # Landmarks and per-frame features are float32 (MediaPipe landmarks are float32 to
+    # begin with); the motion math itself runs in float64.
+    n_slots = -(-max(frame_count, 0) // stride)
+    points = np.empty((n_slots, len(MOTION_LANDMARKS), 3), dtype=np.float32)
+    detected = np.zeros(n_slots, dtype=bool)
+    features = {column: np.full(n_slots, np.nan, dtype=np.float32) for column in FEATURE_COLUMNS}
+    face_landmarks = np.full((n_slots, len(DEBUG_POINTS), 2), np.nan, dtype=np.float32) if keep_landmarks else None
+    n_frames = 0
 
     print(f"Processing video: {video_path}")
 
-    for idx in tqdm(range(frame_count), desc="Face Analysis"):
+    # Frames are decoded ahead on a background thread while FaceMesh runs, and
+    # converted to RGB into one reused buffer (FaceMesh copies its input)
+    rgb = None
+    frames = read_frames(cap, frame_count, stride=stride)
+    # The progress bar refreshes about every 1% of frames (and at most every 0.5 s)
+    progress = tqdm(frames, total=n_slots, desc="Face Analysis",
+                    miniters=max(1, n_slots // 100), mininterval=0.5)
+    for idx, frame in enumerate(progress):
+        frame_idx = idx * stride
         if progress_callback:
-            progress_callback(idx / frame_count, "Processing - Face analysis")
+            progress_callback(frame_idx / frame_count, "Processing - Face analysis")
 
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        timestamp = idx / fps
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        n_frames = idx + 1
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
         results = face_mesh.process(rgb)
 
-        head_speed = np.nan
-        dg = np.nan
-        head_tilt = np.nan
-        smile = np.nan
-
         if results.multi_face_landmarks:
             lm = results.multi_face_landmarks[0].landmark
-
-            # ----- METRIC 0 : IOD (Normalization Factor) -----
-            iod = compute_inter_ocular_distance(lm)
-
-            # ----- HEAD STABILITY -----
-            head_center = compute_head_center(lm)
-            if prev_head_center is not None:
-                raw_speed = np.linalg.norm(head_center - prev_head_center)
-
-                # Normalize by IOD and convert to per-second units (fps-agnostic)
-                if iod > 0:
-                    head_speed = (raw_speed / iod) * fps  # IOD/sec
-                else:
-                    head_speed = 0.0
-            prev_head_center = head_center
-
-            # ----- GAZE CONSISTENCY -----
-            iris_center = compute_iris_centers(lm)
-            face_center = compute_face_center(lm)
-
-            gaze_vec = iris_center - face_center
-            gaze_vec = gaze_vec / (np.linalg.norm(gaze_vec) + 1e-6)
-
-            if prev_gaze is not None:
-                # Convert to per-second units (fps-agnostic)
-                dg = np.linalg.norm(gaze_vec - prev_gaze) * fps  # per sec
-            prev_gaze = gaze_vec
-
-            # ----- SMILE ACTIVATION -----
-            raw_smile = compute_smile_activation(lm)
-            if iod > 0:
-                smile = raw_smile / iod
-            else:
-                smile = 0.0
+            points[idx] = [(lm[i].x, lm[i].y, lm[i].z) for i in MOTION_LANDMARKS]
+            detected[idx] = True
+            if keep_landmarks:
+                face_landmarks[idx] = [(lm[i].x, lm[i].y) for i in DEBUG_POINTS]
 
             # ----- HEAD TILT (Head Pitch via solvePnP) -----
-            head_tilt = compute_head_tilt(lm, img_w, img_h)
-
-        features.append({
-            "timestamp": timestamp,
-            "head_speed": head_speed,
-            "gaze_dg": dg,
-            "head_tilt": head_tilt,
-            "smile": smile
-        })
+            features["head_tilt"][idx] = compute_head_tilt(lm, img_w, img_h)
 
     cap.release()
-    face_mesh.close()
 
-    df = pd.DataFrame(features).set_index("timestamp")
+    # ----- HEAD STABILITY / GAZE CONSISTENCY / SMILE ACTIVATION -----
+    # Speeds compare each face with the previous analyzed frame that had one
+    # (analyzed frames are stride frames apart)
+    face_frames = np.flatnonzero(detected[:n_frames])
+    head_speed, gaze_dg, smile = compute_face_motion(points[face_frames], fps / stride)
+    features["head_speed"][face_frames] = head_speed
+    features["gaze_dg"][face_frames] = gaze_dg
+    features["smile"][face_frames] = smile
+
+    # Timestamps for all analyzed frames at once. Kept as float64 frame_idx / fps (not
+    # a multiply by 1/fps) so frames land in exactly the same second as before
+    timestamps = np.arange(n_frames) * stride / fps
+
+    df = pd.DataFrame(
+        {column: values[:n_frames] for column, values in features.items()},
+        index=pd.Index(timestamps, name="timestamp")
+    )
     df["second"] = df.index.astype(int)
 
+    if keep_landmarks:
+        return df, face_landmarks[:n_frames]
     return df
+
+def _init_worker():
+    # One OpenCV thread per worker process: the parallelism comes from the processes
+    cv2.setNumThreads(1)
+    # Never reuse a FaceMesh inherited from the parent process
+    _forget_face_mesh()
+
+def process_videos(video_paths, workers=None):
+    """
+    Run process_video on several videos in parallel, one worker process per video.
+
+    Args:
+        video_paths (list): Paths to the input video files.
+        workers (int, optional): Number of worker processes (default: half the CPUs).
+
+    Returns:
+        list: One DataFrame per video (see process_video), in input order.
+    """
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+    # Spawned, not forked: MediaPipe graphs (and their threads and locks) do not
+    # survive a fork, so forked workers of a parent that already ran FaceMesh hang
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    ) as executor:
+        return list(executor.map(process_video, video_paths))
@@ -3,49 +3,87 @@ Geometric helper functions for the VERA Face Module.
 Calculates 3D points and distances from MediaPipe landmarks.
 """
 
+import math
+from functools import lru_cache
+
+import cv2
 import numpy as np
 
-def compute_head_center(lm):
-    """
-    Compute the 3D head center using the left and right ear landmarks.
-    """
-    left_ear  = np.array([lm[234].x, lm[234].y, lm[234].z])
-    right_ear = np.array([lm[454].x, lm[454].y, lm[454].z])
-    return (left_ear + right_ear) / 2
+from src.face.config import HEAD_POINTS, GAZE_POINTS, SMILE_POINTS
 
-def compute_iris_centers(lm):
-    """
-    Compute the 3D midpoint between the left and right iris centers.
-    """
-    left_iris = np.array([lm[468].x, lm[468].y, lm[468].z])
-    right_iris = np.array([lm[473].x, lm[473].y, lm[473].z])
-    return (left_iris + right_iris) / 2
+# Landmarks used by the motion metrics, in the row order of compute_face_motion's input:
+# ears (head center), irises (gaze / IOD), nose (face center), lip corners (smile)
+MOTION_LANDMARKS = HEAD_POINTS[:2] + GAZE_POINTS[:2] + HEAD_POINTS[2:] + SMILE_POINTS
 
-def compute_inter_ocular_distance(lm):
-    """
-    Compute the Euclidean distance between left and right irises.
-    Used as a normalization factor (IOD) for scale invariance.
+def compute_face_motion(points, fps):
     """
-    left_iris = np.array([lm[468].x, lm[468].y, lm[468].z])
-    right_iris = np.array([lm[473].x, lm[473].y, lm[473].z])
-    return np.linalg.norm(left_iris - right_iris)
+    Vectorized head speed, gaze change and smile over consecutive detected frames.
 
-def compute_face_center(lm):
-    """
-    Compute a stable 3D anchor point on the face, using the nose bridge landmark.
-    """
-    nose = np.array([lm[1].x, lm[1].y, lm[1].z])
-    return nose
+    Head speed is the motion of the ear midpoint, gaze change the motion of the unit
+    iris-midpoint -> nose vector and smile the lip-corner distance, all relative to the
+    inter-ocular distance (IOD, between the irises), computed for all frames at once.
 
-def compute_smile_activation(lm):
-    """
-    Compute smile activation as the Euclidean distance
-    between left and right lip corners.
-    """
-    left = np.array([lm[61].x, lm[61].y, lm[61].z])
-    right = np.array([lm[291].x, lm[291].y, lm[291].z])
+    Args:
+        points (np.ndarray): (n_frames, len(MOTION_LANDMARKS), 3) landmark coordinates
+                             of the frames where a face was found, in time order.
+        fps (float): Video frame rate (speeds are per second).
 
-    return np.linalg.norm(left - right)
+    Returns:
+        tuple: (head_speed, gaze_dg, smile) arrays of shape (n_frames,). Speeds are NaN
+               for the first frame (no previous face); IOD <= 0 gives 0.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    left_ear, right_ear, left_iris, right_iris, nose, left_lip, right_lip = points.transpose(1, 0, 2)
+
+    iod = np.linalg.norm(left_iris - right_iris, axis=-1)
+    safe_iod = np.where(iod > 0, iod, 1.0)
+
+    head_speed = np.full(len(points), np.nan)
+    gaze_dg = np.full(len(points), np.nan)
+
+    # Head speed in IOD/sec (normalized by the current frame's IOD)
+    head_center = (left_ear + right_ear) / 2
+    raw_speed = np.linalg.norm(np.diff(head_center, axis=0), axis=-1)
+    head_speed[1:] = np.where(iod[1:] > 0, raw_speed / safe_iod[1:] * fps, 0.0)
+
+    # Gaze change per sec of the unit iris-center -> nose vector
+    gaze_vec = (left_iris + right_iris) / 2 - nose
+    gaze_vec *= 1.0 / (np.linalg.norm(gaze_vec, axis=-1, keepdims=True) + 1e-6)
+    gaze_dg[1:] = np.linalg.norm(np.diff(gaze_vec, axis=0), axis=-1) * fps
+
+    # Smile activation normalized by IOD
+    raw_smile = np.linalg.norm(left_lip - right_lip, axis=-1)
+    smile = np.where(iod > 0, raw_smile / safe_iod, 0.0)
+
+    return head_speed, gaze_dg, smile
+
+# 3D model points (canonical face model in arbitrary units)
+# These are approximate 3D coordinates of facial landmarks
+HEAD_MODEL_POINTS = np.array([
+    [0.0, 0.0, 0.0],        # Nose tip (landmark 1)
+    [0.0, -63.6, -12.5],    # Chin (landmark 152)
+    [-43.3, 32.7, -26.0],   # Left eye outer corner (landmark 33)
+    [43.3, 32.7, -26.0],    # Right eye outer corner (landmark 263)
+    [-28.9, -28.9, -24.1],  # Left mouth corner (landmark 61)
+    [28.9, -28.9, -24.1],   # Right mouth corner (landmark 291)
+], dtype=np.float64)
+
+# Assume no lens distortion
+HEAD_POSE_DIST_COEFFS = np.zeros((4, 1))
+
+@lru_cache(maxsize=4)
+def _camera_matrix(img_w, img_h):
+    # Camera matrix (approximate, assuming centered principal point).
+    # Constant for a given resolution, so built once per video size.
+    focal_length = img_w
+    center = (img_w / 2, img_h / 2)
+    camera_matrix = np.array([
+        [focal_length, 0, center[0]],
+        [0, focal_length, center[1]],
+        [0, 0, 1]
+    ], dtype=np.float64)
+    camera_matrix.flags.writeable = False
+    return camera_matrix
 
 
 def compute_head_tilt(lm, img_w=640, img_h=480):
@@ -64,19 +102,6 @@ def compute_head_tilt(lm, img_w=640, img_h=480):
         float: Head pitch angle in degrees.
                Positive = head tilted down, Negative = head tilted up.
     """
-    import cv2
-
-    # 3D model points (canonical face model in arbitrary units)
-    # These are approximate 3D coordinates of facial landmarks
-    model_points = np.array([
-        [0.0, 0.0, 0.0],        # Nose tip (landmark 1)
-        [0.0, -63.6, -12.5],    # Chin (landmark 152)
-        [-43.3, 32.7, -26.0],   # Left eye outer corner (landmark 33)
-        [43.3, 32.7, -26.0],    # Right eye outer corner (landmark 263)
-        [-28.9, -28.9, -24.1],  # Left mouth corner (landmark 61)
-        [28.9, -28.9, -24.1],   # Right mouth corner (landmark 291)
-    ], dtype=np.float64)
-
     # 2D image points from landmarks
     image_points = np.array([
         [lm[1].x * img_w, lm[1].y * img_h],      # Nose tip
@@ -87,21 +112,10 @@ def compute_head_tilt(lm, img_w=640, img_h=480):
         [lm[291].x * img_w, lm[291].y * img_h],  # Right mouth corner
     ], dtype=np.float64)
 
-    # Camera matrix (approximate, assuming centered principal point)
-    focal_length = img_w
-    center = (img_w / 2, img_h / 2)
-    camera_matrix = np.array([
-        [focal_length, 0, center[0]],
-        [0, focal_length, center[1]],
-        [0, 0, 1]
-    ], dtype=np.float64)
-
-    # Assume no lens distortion
-    dist_coeffs = np.zeros((4, 1))
-
     # Solve PnP to get rotation and translation vectors
+    # (model points, camera matrix and distortion are built once, not per frame)
     success, rotation_vec, translation_vec = cv2.solvePnP(
-        model_points, image_points, camera_matrix, dist_coeffs,
+        HEAD_MODEL_POINTS, image_points, _camera_matrix(img_w, img_h), HEAD_POSE_DIST_COEFFS,
         flags=cv2.SOLVEPNP_ITERATIVE
     )
 
@@ -113,15 +127,14 @@ def compute_head_tilt(lm, img_w=640, img_h=480):
 
     # Extract Euler angles from rotation matrix
     # Using decomposition: R = Rz * Ry * Rx
-    sy = np.sqrt(rotation_mat[0, 0]**2 + rotation_mat[1, 0]**2)
-
-    if sy > 1e-6:
-        pitch = np.arctan2(-rotation_mat[2, 0], sy)
-    else:
-        pitch = np.arctan2(-rotation_mat[2, 0], sy)
+    # (scalar math: np.sqrt/np.arctan2 on single floats only add dispatch overhead)
+    # (pitch does not depend on the gimbal-lock branch: atan2 handles sy ~ 0)
+    r00, r10, r20 = rotation_mat[0, 0], rotation_mat[1, 0], rotation_mat[2, 0]
+    sy = math.sqrt(r00 * r00 + r10 * r10)
+    pitch = math.atan2(-r20, sy)
 
     # Convert to degrees
-    pitch_degrees = np.degrees(pitch)
+    pitch_degrees = math.degrees(pitch)
 
     # MediaPipe coordinate system: positive pitch = looking down
     return pitch_degrees
@@ -3,16 +3,15 @@ Main pipeline orchestration for the VERA Face Module.
 Runs extraction, scoring, and visualization, saving results to a structured output directory.
 """
 
-import os
 import json
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from src.face.extraction import process_video
 from src.face.scoring import compute_scores
 from src.face.visualization import create_debug_video
 
-def run_face_pipeline(video_path, output_dir=None, progress_callback=None):
+def run_face_pipeline(video_path, output_dir=None, progress_callback=None, stride=1):
     """
     Run the full face analysis pipeline on a video.
 
@@ -20,6 +19,7 @@ def run_face_pipeline(video_path, output_dir=None, progress_callback=None):
         video_path (str): Path to the input video.
         output_dir (str, optional): Directory to save results.
                                     If None, defaults to 'data/processed/<video_name>'.
+        stride (int): Analyze every stride-th frame only (see process_video).
 
     Returns:
         dict: The final scores dictionary.
@@ -41,54 +41,57 @@ def run_face_pipeline(video_path, output_dir=None, progress_callback=None):
 
     # 1. Extraction
     print("--- Step 1: Extraction ---")
-    print("--- Step 1: Extraction ---")
-    raw_df = process_video(str(video_path), progress_callback=progress_callback)
+    # Debug landmarks are kept so the debug video does not re-run FaceMesh
+    raw_df, face_landmarks = process_video(
+        str(video_path), progress_callback=progress_callback, stride=stride, keep_landmarks=True
+    )
 
-    # 2. Scoring
-    print("--- Step 2: Scoring ---")
-    # Scoring
+    # 2. Scoring (scores, windows and timelines in one call)
     print("--- Step 2: Scoring ---")
-    # Moved compute_scores call down to capture return values correctly
-
-    # 3. Save Results
-    print("--- Step 3: Saving Results ---")
-
-    # Save Raw Data (Frame-by-Frame)
-    raw_data_path = output_dir / "df_Face_raw_data.csv"
-    raw_df.to_csv(raw_data_path)
-    print(f"✅ Saved raw data to: {raw_data_path}")
-
-    # Compute Scores & Timeline
     scores, window_df, timeline_smooth_df, raw_1s_df = compute_scores(raw_df)
 
-    # Save Processed Metrics (Windowed/Smoothed)
-    metrics_path = output_dir / "metrics_face.csv"
-    window_df.to_csv(metrics_path, index=False)
-    print(f"✅ Saved processed metrics to: {metrics_path}")
-
-    # Save Raw 1-Second Timeline (direct aggregation from frames)
-    raw_timeline_path = output_dir / "1s_raw_timeline_face.csv"
-    raw_1s_df.to_csv(raw_timeline_path, index=False)
-    print(f"✅ Saved raw 1s timeline to: {raw_timeline_path}")
-
-    # Save Smooth 1-Second Timeline (projected from 5s windows)
-    smooth_timeline_path = output_dir / "1s_smooth_timeline_face.csv"
-    timeline_smooth_df.to_csv(smooth_timeline_path, index=False)
-    print(f"✅ Saved smooth 1s timeline to: {smooth_timeline_path}")
-
-    # Save results JSON
-    results_path = output_dir / "results_face.json"
-    with open(results_path, "w") as f:
-        json.dump(scores, f, indent=4)
-    print(f"✅ Saved scores to: {results_path}")
-
-    # 4. Visualization
-    print("--- Step 4: Visualization ---")
-    if progress_callback:
-        progress_callback(1.0, "Processing - Face debug file creation")
-    debug_video_path = output_dir / "debug_face.mp4"
-    create_debug_video(str(video_path), str(debug_video_path))
-    print(f"✅ Saved debug video to: {debug_video_path}")
+    # 3-4. Save Results while the debug video is rendered on a worker thread
+    # (OpenCV/MediaPipe and the CSV writers release the GIL, so the two overlap)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        print("--- Step 3: Saving Results (debug video rendering in parallel) ---")
+        if progress_callback:
+            progress_callback(1.0, "Processing - Face debug file creation")
+        debug_video_path = output_dir / "debug_face.mp4"
+        video_future = executor.submit(
+            create_debug_video, str(video_path), str(debug_video_path),
+            face_landmarks=face_landmarks, stride=stride
+        )
+
+        # Save Raw Data (Frame-by-Frame)
+        raw_data_path = output_dir / "df_Face_raw_data.csv"
+        raw_df.to_csv(raw_data_path)
+        print(f"✅ Saved raw data to: {raw_data_path}")
+
+        # Save Processed Metrics (Windowed/Smoothed)
+        metrics_path = output_dir / "metrics_face.csv"
+        window_df.to_csv(metrics_path, index=False)
+        print(f"✅ Saved processed metrics to: {metrics_path}")
+
+        # Save Raw 1-Second Timeline (direct aggregation from frames)
+        raw_timeline_path = output_dir / "1s_raw_timeline_face.csv"
+        raw_1s_df.to_csv(raw_timeline_path, index=False)
+        print(f"✅ Saved raw 1s timeline to: {raw_timeline_path}")
+
+        # Save Smooth 1-Second Timeline (projected from 5s windows)
+        smooth_timeline_path = output_dir / "1s_smooth_timeline_face.csv"
+        timeline_smooth_df.to_csv(smooth_timeline_path, index=False)
+        print(f"✅ Saved smooth 1s timeline to: {smooth_timeline_path}")
+
+        # Save results JSON
+        results_path = output_dir / "results_face.json"
+        with open(results_path, "w") as f:
+            json.dump(scores, f, indent=4)
+        print(f"✅ Saved scores to: {results_path}")
+
+        # 4. Visualization
+        print("--- Step 4: Visualization ---")
+        video_future.result()
+        print(f"✅ Saved debug video to: {debug_video_path}")
 
     print("🎉 Pipeline completed successfully!")
     return scores
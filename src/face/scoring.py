@@ -20,74 +20,39 @@ from src.face.config import (
     INTERPRETATION_RANGES,
     CHANGE_THRESHOLDS
 )
-from src.utils.temporal import project_windows_to_seconds
-from src.utils.scoring_utils import compute_tiered_score
-
-
-def compute_change_labels(values, metric_id):
-    """
-    Compute window-to-window deltas and labels for temporal stability analysis.
-
-    Args:
-        values: Series or array of raw metric values per window
-        metric_id: Metric name to look up thresholds
-
-    Returns:
-        tuple: (deltas array, labels list)
-    """
-    values = np.asarray(values, dtype=float)
-    if len(values) < 2:
-        return np.array([]), []
-
-    deltas = np.abs(np.diff(values))
-    thresholds = CHANGE_THRESHOLDS.get(metric_id, {"stable": 0.1, "shifting": 0.3})
-
-    labels = []
-    for d in deltas:
-        if d <= thresholds["stable"]:
-            labels.append("stable")
-        elif d <= thresholds["shifting"]:
-            labels.append("shifting")
-        else:
-            labels.append("erratic")
-
-    return deltas, labels
+from src.utils.temporal import aggregate_per_second, project_window_values
+from src.utils.scoring_utils import (
+    build_interpretation_lookup,
+    lookup_interpretation,
+    build_tiered_lookup,
+    build_change_bounds,
+    score_windows,
+    memoize_by_frame
+)
 
-def sliding_windows(series, window=5):
-    """
-    Apply a sliding window to a pandas Series.
-    Returns a DataFrame with start_sec, end_sec, and mean value for the window.
-    """
-    rows = []
-    seconds = series.index.values
+# Bucket search tables for get_interpretation, built once at import
+INTERPRETATION_LOOKUP = build_interpretation_lookup(INTERPRETATION_RANGES)
 
-    for start in seconds:
-        end = start + window
+# Tiered scoring bucket arrays per metric, built once at import
+TIERED_LOOKUP = build_tiered_lookup(INTERPRETATION_RANGES)
 
-        win = series.loc[start:end]
+# (stable, shifting) bounds per metric, resolved once at import
+CHANGE_BOUNDS = build_change_bounds(CHANGE_THRESHOLDS)
 
-        if len(win) == window + 1:
-            rows.append({
-                "start_sec": start,
-                "end_sec": end,
-                "value": win.mean()
-            })
+# (per-second column, metric id) pairs scored over sliding windows, in output column order
+WINDOW_METRICS = [
+    ("head_speed", "head_stability"),
+    ("gaze_jitter", "gaze_stability"),
+    ("smile", "smile_activation"),
+    ("head_down_ratio", "head_down_ratio")
+]
 
-    return pd.DataFrame(rows)
 
 def get_interpretation(metric_type, raw_value):
     """
     Get text interpretation, coaching, and label based on raw value and buckets.
     """
-    buckets = INTERPRETATION_RANGES.get(metric_type, [])
-
-    # Iterate through buckets to find the matching range
-    for bucket in buckets:
-        if raw_value <= bucket["max"]:
-            return bucket["text"], bucket["coaching"], bucket["label"]
-
-    # Fallback (should not happen with max=999)
-    return "Value out of range", "Check your settings.", "unknown"
+    return lookup_interpretation(INTERPRETATION_LOOKUP, metric_type, raw_value)
 
 def get_global_interpretation(score):
     """
@@ -100,6 +65,7 @@ def get_global_interpretation(score):
     return "Score out of range"
 
 
+@memoize_by_frame()
 def compute_scores(raw_df):
     """
     Compute aggregated scores from raw frame data.
@@ -114,15 +80,21 @@ def compute_scores(raw_df):
                timeline_1s contains the 1Hz timeline with values and scores.
     """
     # 1. Aggregate per second
+    # Seconds are small integers, so every column is reduced with np.bincount
+    # instead of a pandas groupby.
     # Head Stability: Use MEAN speed (IOD/sec) to match baseline (0.35 IOD/sec)
-    head_speed_1s  = raw_df.groupby("second")["head_speed"].mean().fillna(0)
-    jitter_gaze_1s = raw_df.groupby("second")["gaze_dg"].var().fillna(0)
-    smile_1s       = raw_df.groupby("second")["smile"].mean().fillna(0)
-
     # Head Down Ratio: % of frames per second where head is tilted down
-    head_down_1s = raw_df.groupby("second")["head_tilt"].apply(
-        lambda x: (x > HEAD_DOWN_ANGLE_THRESHOLD).mean()
+    per_second = aggregate_per_second(
+        raw_df["second"].to_numpy(),
+        head_speed=(raw_df["head_speed"].to_numpy(), "mean"),
+        gaze_jitter=(raw_df["gaze_dg"].to_numpy(), "var"),
+        smile=(raw_df["smile"].to_numpy(), "mean"),
+        head_down_ratio=(raw_df["head_tilt"].to_numpy() > HEAD_DOWN_ANGLE_THRESHOLD, "mean")
     ).fillna(0)
+    head_speed_1s  = per_second["head_speed"]
+    jitter_gaze_1s = per_second["gaze_jitter"]
+    smile_1s       = per_second["smile"]
+    head_down_1s   = per_second["head_down_ratio"]
 
     # Build 1-second raw timeline DataFrame (before windowing)
     raw_1s_df = pd.DataFrame({
@@ -133,177 +105,50 @@ def compute_scores(raw_df):
         "smile": smile_1s.values
     })
 
-    # 2. Sliding Windows (5s)
-    df_head_5s  = sliding_windows(head_speed_1s)
-    df_gaze_5s  = sliding_windows(jitter_gaze_1s)
-    df_smile_5s = sliding_windows(smile_1s)
-    df_head_down_5s = sliding_windows(head_down_1s)
+    # 2-4. Sliding Windows (5s), Tiered Parabolic scores and window deltas
+    window_df, window_scores = score_windows(
+        raw_1s_df, WINDOW_METRICS, TIERED_LOOKUP, CHANGE_BOUNDS, score_suffix="comm_score"
+    )
 
     # If video is too short for windows, handle gracefully
-    if df_head_5s.empty:
+    if window_scores is None:
         return {
             "error": "Video too short for analysis (needs > 5 seconds)"
         }, pd.DataFrame(), pd.DataFrame(), raw_1s_df
 
-    # 3. Scoring Logic (Tiered Parabolic)
-
-    # --- HEAD STABILITY ---
-    head_val = df_head_5s["value"]
-    df_head_5s["comm_score"] = head_val.apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["head_stability"])
-    )
-
-    # --- GAZE CONSISTENCY ---
-    gaze_val = df_gaze_5s["value"]
-    df_gaze_5s["comm_score"] = gaze_val.apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["gaze_stability"])
-    )
-
-    # --- SMILE ACTIVATION ---
-    smile_val = df_smile_5s["value"]
-    df_smile_5s["comm_score"] = smile_val.apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["smile_activation"])
-    )
-
-    # --- HEAD DOWN RATIO ---
-    head_down_val = df_head_down_5s["value"]
-    df_head_down_5s["comm_score"] = head_down_val.apply(
-        lambda x: compute_tiered_score(x, INTERPRETATION_RANGES["head_down_ratio"])
-    )
-
-    # --- GLOBAL SCORE ---
-    global_comm_score = (
-        df_head_5s["comm_score"].mean() +
-        df_gaze_5s["comm_score"].mean() +
-        df_smile_5s["comm_score"].mean() +
-        df_head_down_5s["comm_score"].mean()
-    ) / 4
-
-    # --- WINDOW-TO-WINDOW DELTAS (for timeline stability analysis) ---
-    head_deltas, head_labels = compute_change_labels(head_val.values, "head_stability")
-    gaze_deltas, gaze_labels = compute_change_labels(gaze_val.values, "gaze_stability")
-    smile_deltas, smile_labels = compute_change_labels(smile_val.values, "smile_activation")
-
-    # Add deltas/labels to window_df (aligned to transition between windows)
-    # Delta at index i represents change from window i to window i+1
-    df_head_5s["delta"] = np.nan
-    df_head_5s["change_label"] = ""
-    if len(head_deltas) > 0:
-        df_head_5s.iloc[:-1, df_head_5s.columns.get_loc("delta")] = head_deltas
-        df_head_5s.iloc[:-1, df_head_5s.columns.get_loc("change_label")] = head_labels
-
-    df_gaze_5s["delta"] = np.nan
-    df_gaze_5s["change_label"] = ""
-    if len(gaze_deltas) > 0:
-        df_gaze_5s.iloc[:-1, df_gaze_5s.columns.get_loc("delta")] = gaze_deltas
-        df_gaze_5s.iloc[:-1, df_gaze_5s.columns.get_loc("change_label")] = gaze_labels
-
-    df_smile_5s["delta"] = np.nan
-    df_smile_5s["change_label"] = ""
-    if len(smile_deltas) > 0:
-        df_smile_5s.iloc[:-1, df_smile_5s.columns.get_loc("delta")] = smile_deltas
-        df_smile_5s.iloc[:-1, df_smile_5s.columns.get_loc("change_label")] = smile_labels
-
-    head_down_deltas, head_down_labels = compute_change_labels(head_down_val.values, "head_down_ratio")
-    df_head_down_5s["delta"] = np.nan
-    df_head_down_5s["change_label"] = ""
-    if len(head_down_deltas) > 0:
-        df_head_down_5s.iloc[:-1, df_head_down_5s.columns.get_loc("delta")] = head_down_deltas
-        df_head_down_5s.iloc[:-1, df_head_down_5s.columns.get_loc("change_label")] = head_down_labels
-
-    # 4. Prepare Outputs
-
-    # Merge window dataframes for export
-    # Rename columns to be clear
-    df_head_5s = df_head_5s.rename(columns={
-        "value": "head_speed_val",
-        "comm_score": "head_stability_comm_score",
-        "delta": "head_stability_delta",
-        "change_label": "head_stability_change_label"
-    })
-    df_gaze_5s = df_gaze_5s.rename(columns={
-        "value": "gaze_jitter_val",
-        "comm_score": "gaze_stability_comm_score",
-        "delta": "gaze_stability_delta",
-        "change_label": "gaze_stability_change_label"
-    })
-    df_smile_5s = df_smile_5s.rename(columns={
-        "value": "smile_val",
-        "comm_score": "smile_activation_comm_score",
-        "delta": "smile_activation_delta",
-        "change_label": "smile_activation_change_label"
-    })
-    df_head_down_5s = df_head_down_5s.rename(columns={
-        "value": "head_down_ratio_val",
-        "comm_score": "head_down_ratio_comm_score",
-        "delta": "head_down_ratio_delta",
-        "change_label": "head_down_ratio_change_label"
-    })
+    # 5. Global Score, Interpretations, Coaching & Labels
+    # Per-metric means of the window values and communication scores, taken in one
+    # pass each (one metric per contiguous row) and unboxed to Python floats with tolist()
+    val_columns = [f"{column}_val" for column, _ in WINDOW_METRICS]
+    val_means = np.ascontiguousarray(window_df[val_columns].to_numpy().T).mean(axis=1).tolist()
+    comm_means = window_scores.mean(axis=1).tolist()
 
-    # Merge on start_sec/end_sec
-    window_df = df_head_5s.merge(df_gaze_5s, on=["start_sec", "end_sec"]).merge(df_smile_5s, on=["start_sec", "end_sec"]).merge(df_head_down_5s, on=["start_sec", "end_sec"])
+    global_comm_score = sum(comm_means) / 4
 
     # Add Global Score to window_df (constant column)
     window_df["global_comm_score"] = global_comm_score
 
-    # 5. Get Interpretations & Coaching & Labels
-
-    # Communication Scores (Absolute)
-    head_mean_comm = df_head_5s["head_stability_comm_score"].mean()
-    gaze_mean_comm = df_gaze_5s["gaze_stability_comm_score"].mean()
-    smile_mean_comm = df_smile_5s["smile_activation_comm_score"].mean()
-    head_down_mean_comm = df_head_down_5s["head_down_ratio_comm_score"].mean()
-
-    # Mean raw values for interpretation
-    head_mean_val = df_head_5s["head_speed_val"].mean()
-    gaze_mean_val = df_gaze_5s["gaze_jitter_val"].mean()
-    smile_mean_val = df_smile_5s["smile_val"].mean()
-    head_down_mean_val = df_head_down_5s["head_down_ratio_val"].mean()
-
-    interp_head_comm, coach_head_comm, label_head_comm = get_interpretation("head_stability", head_mean_val)
-    interp_gaze_comm, coach_gaze_comm, label_gaze_comm = get_interpretation("gaze_stability", gaze_mean_val)
-    interp_smile_comm, coach_smile_comm, label_smile_comm = get_interpretation("smile_activation", smile_mean_val)
-    interp_head_down_comm, coach_head_down_comm, label_head_down_comm = get_interpretation("head_down_ratio", head_down_mean_val)
-
     scores = {
-        "global_comm_score": float(global_comm_score),
-        "face_global_interpretation": get_global_interpretation(global_comm_score),
-
-        # Head Stability
-        "head_stability_communication_score": float(head_mean_comm),
-        "head_stability_val": float(head_mean_val),
-        "head_stability_communication_interpretation": interp_head_comm,
-        "head_stability_communication_coaching": coach_head_comm,
-        "head_stability_label": label_head_comm,
-
-        # Gaze Consistency
-        "gaze_stability_communication_score": float(gaze_mean_comm),
-        "gaze_stability_val": float(gaze_mean_val),
-        "gaze_stability_communication_interpretation": interp_gaze_comm,
-        "gaze_stability_communication_coaching": coach_gaze_comm,
-        "gaze_stability_label": label_gaze_comm,
-
-        # Smile Activation
-        "smile_activation_communication_score": float(smile_mean_comm),
-        "smile_activation_val": float(smile_mean_val),
-        "smile_activation_communication_interpretation": interp_smile_comm,
-        "smile_activation_communication_coaching": coach_smile_comm,
-        "smile_activation_label": label_smile_comm,
-
-        # Head Down Ratio
-        "head_down_ratio_communication_score": float(head_down_mean_comm),
-        "head_down_ratio_val": float(head_down_mean_val),
-        "head_down_ratio_communication_interpretation": interp_head_down_comm,
-        "head_down_ratio_communication_coaching": coach_head_down_comm,
-        "head_down_ratio_label": label_head_down_comm,
+        "global_comm_score": global_comm_score,
+        "face_global_interpretation": get_global_interpretation(global_comm_score)
     }
+    for (_, metric_id), val_mean, comm_mean in zip(WINDOW_METRICS, val_means, comm_means):
+        interpretation, coaching, label = get_interpretation(metric_id, val_mean)
+        scores[f"{metric_id}_communication_score"] = comm_mean
+        scores[f"{metric_id}_val"] = val_mean
+        scores[f"{metric_id}_communication_interpretation"] = interpretation
+        scores[f"{metric_id}_communication_coaching"] = coaching
+        scores[f"{metric_id}_label"] = label
 
     # Project Raw Values (_val), Communication Scores (_comm_score), and deltas (numeric only)
     # Note: change_label columns are strings and cannot be projected via mean
     cols_to_project = [c for c in window_df.columns
                        if "_val" in c or "_comm_score" in c or "_delta" in c]
-    projection_input = window_df[["start_sec", "end_sec"] + cols_to_project]
-
-    timeline_1s = project_windows_to_seconds(projection_input)
+    timeline_1s = project_window_values(
+        window_df["start_sec"].to_numpy(),
+        window_df["end_sec"].to_numpy(),
+        window_df[cols_to_project].to_numpy(dtype=np.float64),
+        cols_to_project
+    )
 
     return scores, window_df, timeline_1s, raw_1s_df
@@ -4,40 +4,32 @@ Generates a debug video with facial landmarks overlaid.
 """
 
 import cv2
+import numpy as np
 import mediapipe as mp
 import os
 import subprocess
 import imageio_ffmpeg
 from tqdm import tqdm
-from src.face.config import (
-    HEAD_POINTS,
-    GAZE_POINTS,
-    EXPRESS_POINTS,
-    SMILE_POINTS,
-    COLOR_HEAD,
-    COLOR_GAZE,
-    COLOR_EXP,
-    COLOR_SMILE
-)
-
-def create_debug_video(video_path, output_path):
+from src.face.config import DEBUG_POINT_GROUPS, DEBUG_POINTS
+
+# (radius, color) of each DEBUG_POINTS keypoint (head, gaze, expressiveness, smile)
+KEYPOINT_STYLES = [(radius, color) for points, radius, color in DEBUG_POINT_GROUPS for _ in points]
+
+def create_debug_video(video_path, output_path, face_landmarks=None, stride=1):
     """
-    Process the video again to draw landmarks and save a debug video.
+    Draw face landmarks on the video and save a debug video.
 
     Args:
         video_path (str): Path to the input video.
         output_path (str): Path to save the output video.
+        face_landmarks (np.ndarray, optional): Per-frame (x, y) of DEBUG_POINTS from
+            process_video(..., keep_landmarks=True), NaN where no face was found. When
+            given, FaceMesh is not run again; otherwise the video is processed a second time.
+        stride (int): Stride face_landmarks were extracted with. Each analyzed frame's
+                      landmarks are drawn until the next analyzed frame.
     """
     print(f"Generating debug video: {output_path}")
 
-    mp_face_mesh = mp.solutions.face_mesh
-    face_mesh = mp_face_mesh.FaceMesh(
-        refine_landmarks=True,
-        max_num_faces=1,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
-
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         raise ValueError(f"❌ Error loading video: {video_path}")
@@ -47,6 +39,24 @@ def create_debug_video(video_path, output_path):
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+    # Extraction stops at the last frame it can decode, so face_landmarks may be shorter
+    # than the (estimated) frame count; more rows than analyzed frames means it belongs
+    # to another video or stride
+    if face_landmarks is not None and len(face_landmarks) > -(-max(frame_count, 0) // stride):
+        print(f"⚠️ Landmarks do not match the video ({len(face_landmarks)} rows for "
+              f"{frame_count} frames at stride {stride}), running FaceMesh again")
+        face_landmarks = None
+
+    face_mesh = None
+    if face_landmarks is None:
+        mp_face_mesh = mp.solutions.face_mesh
+        face_mesh = mp_face_mesh.FaceMesh(
+            refine_landmarks=True,
+            max_num_faces=1,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
     # Video writer
     out = cv2.VideoWriter(
         output_path,
@@ -55,40 +65,37 @@ def create_debug_video(video_path, output_path):
         (width, height)
     )
 
-    for _ in tqdm(range(frame_count), desc="Generating Video"):
+    for idx in tqdm(range(frame_count), desc="Generating Video"):
         ret, frame = cap.read()
         if not ret:
             break
 
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb)
+        keypoints = None
+        if face_mesh is not None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = face_mesh.process(rgb)
+            if results.multi_face_landmarks:
+                lm = results.multi_face_landmarks[0].landmark
+                keypoints = np.array([(lm[i].x, lm[i].y) for i in DEBUG_POINTS])
+        elif idx // stride < len(face_landmarks) and not np.isnan(face_landmarks[idx // stride, 0, 0]):
+            keypoints = face_landmarks[idx // stride].astype(np.float64)
 
         annotated = frame.copy()
-        if results.multi_face_landmarks:
-            lm = results.multi_face_landmarks[0].landmark
+        if keypoints is not None:
             h, w, _ = frame.shape
 
-            # Head landmarks
-            for i in HEAD_POINTS:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 3, COLOR_HEAD, -1)
-
-            # Gaze landmarks
-            for i in GAZE_POINTS:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 3, COLOR_GAZE, -1)
-
-            # Expressiveness landmarks
-            for i in EXPRESS_POINTS:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 3, COLOR_EXP, -1)
-
-            # Smile landmarks
-            for i in SMILE_POINTS:
-                cv2.circle(annotated, (int(lm[i].x*w), int(lm[i].y*h)), 4, COLOR_SMILE, -1)
+            # Head, gaze, expressiveness and smile landmarks: pixel coords for all
+            # keypoints at once (truncated like int())
+            points = (keypoints * (w, h)).astype(int).tolist()
+            for (x, y), (radius, color) in zip(points, KEYPOINT_STYLES):
+                cv2.circle(annotated, (x, y), radius, color, -1)
 
         out.write(annotated)
 
     cap.release()
     out.release()
-    face_mesh.close()
+    if face_mesh is not None:
+        face_mesh.close()
 
     # Convert to H.264 for browser compatibility
     print("🔄 Converting to H.264...")
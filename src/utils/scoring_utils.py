@@ -1,4 +1,17 @@
+import hashlib
 import numpy as np
+import pandas as pd
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import wraps
+
+from src.utils.temporal import sliding_window_values
+
+# Change labels indexed by how many thresholds a delta exceeds
+CHANGE_LABELS = np.array(["stable", "shifting", "erratic"])
+# Categories of the window_df change_label columns ("" marks the last window, which has no delta)
+CHANGE_LABEL_CATEGORIES = list(CHANGE_LABELS) + [""]
+DEFAULT_CHANGE_BOUNDS = np.array([0.1, 0.3])
 
 def get_optimal_target(buckets):
     """
@@ -103,3 +116,273 @@ def compute_tiered_score(value, buckets):
             score = 1.0 - (1.0 - 0.8) * (norm_pos**2)
 
     return max(0.0, min(1.0, score))
+
+def build_tiered_tables(buckets):
+    """
+    Precompute the bucket arrays compute_tiered_scores needs for one metric.
+
+    The buckets of a metric never change at runtime, so modules build these once
+    at import instead of re-deriving them from the bucket dicts on every call.
+    """
+    maxes = np.array([bucket["max"] for bucket in buckets], dtype=float)
+    return {
+        "target": get_optimal_target(buckets),
+        "maxes": maxes,
+        "prev_maxes": np.concatenate(([0.0], maxes[:-1])),
+        "tiers": np.array([bucket.get("tier", (0.0, 0.0)) for bucket in buckets], dtype=float),
+        "is_optimal": np.array([bucket.get("tier") == (0.8, 1.0) for bucket in buckets])
+    }
+
+def build_tiered_lookup(interpretation_ranges):
+    """
+    build_tiered_tables for every bucket-based metric of an INTERPRETATION_RANGES config.
+    """
+    return {
+        metric: build_tiered_tables(buckets)
+        for metric, buckets in interpretation_ranges.items()
+        if buckets and isinstance(buckets[0], dict)
+    }
+
+def compute_tiered_scores(values, buckets=None, out=None, tables=None):
+    """
+    Vectorized compute_tiered_score over an array of values.
+
+    Buckets are resolved with a single binary search over the bucket maxima and the
+    interpolation/parabola/clamp steps are applied to the whole array at once.
+    Results match compute_tiered_score element by element (up to float rounding).
+
+    Args:
+        values (array-like): Raw metric values.
+        buckets (list): Interpretation buckets (same format as compute_tiered_score).
+        out (np.ndarray, optional): Preallocated float array to write the scores into.
+        tables (dict, optional): Prebuilt build_tiered_tables(buckets), used instead of buckets.
+
+    Returns:
+        np.ndarray: Scores in [0, 1].
+    """
+    values = np.asarray(values, dtype=float)
+    if tables is None:
+        tables = build_tiered_tables(buckets)
+    target = tables["target"]
+    maxes = tables["maxes"]
+    prev_maxes = tables["prev_maxes"]
+    tiers = tables["tiers"]
+    is_optimal = tables["is_optimal"]
+
+    # 1. Find Bucket (first bucket with value <= max; values above all maxes use the last one)
+    idx = np.searchsorted(maxes, values, side="left")
+    found = idx < len(maxes)
+    idx = np.minimum(idx, len(maxes) - 1)
+
+    bucket_min = prev_maxes[idx]
+    bucket_max = np.where(found, maxes[idx], values * 1.2)
+
+    # 2. Get Tier
+    tier_min = tiers[idx, 0]
+    tier_max = tiers[idx, 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 3. Interpolate (the side closer to 'target' gets 'tier_max')
+        dist_min = np.abs(bucket_min - target)
+        dist_max = np.abs(bucket_max - target)
+        ratio = (values - bucket_min) / (bucket_max - bucket_min)
+        score = np.where(
+            dist_min < dist_max,
+            tier_max - (tier_max - tier_min) * ratio,
+            tier_min + (tier_max - tier_min) * ratio
+        )
+
+        # 4. Parabolic Boost for Optimal Bucket
+        midpoint = (bucket_min + bucket_max) / 2.0
+        half_width = (bucket_max - bucket_min) / 2.0
+        norm_pos = (values - midpoint) / half_width
+        score = np.where(is_optimal[idx] & (half_width > 0), 1.0 - (1.0 - 0.8) * (norm_pos**2), score)
+
+        # Clamp to [0, 1] (NaN clamps to 1.0, like max(0.0, min(1.0, nan)))
+        score = np.where(score < 1.0, score, 1.0)
+        score = np.where(score > 0.0, score, 0.0)
+
+        # Open-Ended Buckets (max=999): linear decay up to 999, not clamped
+        open_ended = bucket_max == 999
+        decay = np.where(
+            values >= 999,
+            tier_min,
+            tier_max - (tier_max - tier_min) * ((values - bucket_min) / (999 - bucket_min))
+        )
+        score = np.where(open_ended, decay, score)
+
+    if out is None:
+        return score
+    out[...] = score
+    return out
+
+
+# Returned when a value falls in no interpretation bucket (should not happen with max=999)
+INTERPRETATION_FALLBACK = ("Value out of range", "Check your settings.", "unknown")
+
+def build_interpretation_lookup(interpretation_ranges):
+    """
+    Precompute the bucket search tables of an INTERPRETATION_RANGES config.
+
+    For every bucket-based metric, stores the ascending list of bucket maxes and the
+    matching (text, coaching, label) tuples so lookups become a binary search, plus
+    the same tuples as an object array (fallback appended) for array lookups.
+    Range-based entries (e.g. the global scores) are skipped.
+    """
+    lookup = {}
+    for metric, buckets in interpretation_ranges.items():
+        if not buckets or not isinstance(buckets[0], dict):
+            continue
+        maxes = [bucket["max"] for bucket in buckets]
+        if maxes != sorted(maxes):
+            raise ValueError(f"Interpretation buckets for '{metric}' must have ascending max values")
+        results = [(b["text"], b["coaching"], b["label"]) for b in buckets]
+        table = np.empty((len(results) + 1, 3), dtype=object)
+        table[:] = results + [INTERPRETATION_FALLBACK]
+        lookup[metric] = (maxes, results, table)
+    return lookup
+
+def lookup_interpretation(lookup, metric_type, raw_value):
+    """
+    Get text interpretation, coaching, and label from a build_interpretation_lookup table.
+
+    Returns the first bucket with raw_value <= max, like a linear scan over the buckets.
+    An ndarray of values is resolved with one searchsorted and returns three object
+    arrays (texts, coachings, labels) instead of a tuple of strings.
+    """
+    if isinstance(raw_value, np.ndarray):
+        if metric_type not in lookup:
+            table = np.empty((1, 3), dtype=object)
+            table[0] = INTERPRETATION_FALLBACK
+            idx = np.zeros(raw_value.shape, dtype=np.intp)
+        else:
+            maxes, _, table = lookup[metric_type]
+            # NaN sorts past every max, onto the fallback row
+            idx = np.searchsorted(maxes, raw_value, side="left")
+        texts, coachings, labels = np.moveaxis(table[idx], -1, 0)
+        return texts, coachings, labels
+
+    if metric_type in lookup and raw_value == raw_value: # NaN matches no bucket
+        maxes, results, _ = lookup[metric_type]
+        idx = bisect_left(maxes, raw_value)
+        if idx < len(results):
+            return results[idx]
+
+    # Fallback (should not happen with max=999)
+    return INTERPRETATION_FALLBACK
+
+def build_change_bounds(change_thresholds):
+    """
+    Resolve a CHANGE_THRESHOLDS config into a (stable, shifting) array per metric.
+    """
+    return {
+        metric_id: np.array([thresholds["stable"], thresholds["shifting"]])
+        for metric_id, thresholds in change_thresholds.items()
+    }
+
+def compute_delta_codes(values, bounds=DEFAULT_CHANGE_BOUNDS):
+    """
+    Compute window-to-window deltas and their label codes (indices into CHANGE_LABELS).
+
+    Args:
+        values: Series or array of raw metric values per window
+        bounds: (stable, shifting) upper bounds, both inclusive
+
+    Returns:
+        tuple: (deltas array, int8 codes array)
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return np.array([]), np.array([], dtype=np.int8)
+
+    # |values[i+1] - values[i]| computed into a single buffer
+    deltas = np.empty(len(values) - 1)
+    np.subtract(values[1:], values[:-1], out=deltas)
+    np.abs(deltas, out=deltas)
+
+    # side="left" keeps the bounds inclusive (d <= stable, d <= shifting); NaN sorts last -> erratic
+    return deltas, np.searchsorted(bounds, deltas, side="left").astype(np.int8)
+
+def score_windows(raw_1s_df, window_metrics, tiered_lookup, change_bounds, score_suffix="score", window=5):
+    """
+    Window, score and label per-second metrics (shared by the Body and Face modules).
+
+    Args:
+        raw_1s_df (pd.DataFrame): Per-second metrics with a 'second' column.
+        window_metrics (list): (column, metric_id) pairs in output column order. Window
+                               means are exported as '{column}_val'; scores, deltas and
+                               change labels are named after metric_id.
+        tiered_lookup (dict): build_tiered_lookup tables per metric_id.
+        change_bounds (dict): build_change_bounds table per metric_id.
+        score_suffix (str): Suffix of the score columns (e.g. 'score' or 'comm_score').
+        window (int): Window length in seconds.
+
+    Returns:
+        tuple: (window_df, window_scores) with window_scores of shape (n_metrics, n_windows).
+               (empty DataFrame, None) if no complete window fits.
+    """
+    # All metrics share the same seconds, so they are windowed together as one matrix
+    metrics_1s = raw_1s_df[[column for column, _ in window_metrics]].to_numpy()
+    starts, window_values = sliding_window_values(raw_1s_df["second"].values, metrics_1s, window)
+    if len(starts) == 0:
+        return pd.DataFrame(), None
+
+    # Each metric is scored over all of its windows into one preallocated buffer
+    window_scores = np.empty((len(window_metrics), len(starts)))
+    for row, (_, metric_id) in enumerate(window_metrics):
+        compute_tiered_scores(window_values[:, row], out=window_scores[row], tables=tiered_lookup[metric_id])
+
+    # Delta at index i represents change from window i to window i+1, so each
+    # column is padded with a trailing NaN / "" for the last window. Labels are
+    # stored as Categorical codes (written to CSV as the same strings)
+    window_columns = {"start_sec": starts, "end_sec": starts + window}
+    last_code = np.array([CHANGE_LABEL_CATEGORIES.index("")], dtype=np.int8)
+    for row, (column, metric_id) in enumerate(window_metrics):
+        deltas, codes = compute_delta_codes(
+            window_values[:, row], change_bounds.get(metric_id, DEFAULT_CHANGE_BOUNDS)
+        )
+        window_columns[f"{column}_val"] = window_values[:, row]
+        window_columns[f"{metric_id}_{score_suffix}"] = window_scores[row]
+        window_columns[f"{metric_id}_delta"] = np.append(deltas, np.nan)
+        window_columns[f"{metric_id}_change_label"] = pd.Categorical.from_codes(
+            np.concatenate([codes, last_code]), categories=CHANGE_LABEL_CATEGORIES
+        )
+
+    return pd.DataFrame(window_columns), window_scores
+
+def frame_fingerprint(df):
+    """
+    Content hash of a DataFrame (values, index, column names and dtypes).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(df.columns), [str(dtype) for dtype in df.dtypes], df.index.name)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+def memoize_by_frame(maxsize=8):
+    """
+    LRU-cache a function of a single DataFrame on its content hash.
+
+    Meant for compute_scores(raw_df), which is pure in raw_df: repeated calls on the
+    same frame (notebooks, retries) return the cached outputs. Results are copied in
+    and out of the cache so callers can never mutate a cached entry.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+
+        @wraps(func)
+        def wrapper(raw_df):
+            key = frame_fingerprint(raw_df)
+            if key in cache:
+                cache.move_to_end(key)
+                return tuple(item.copy() for item in cache[key])
+
+            result = func(raw_df)
+            cache[key] = tuple(item.copy() for item in result)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
@@ -8,6 +8,93 @@ specifically for converting sliding window metrics into continuous timelines.
 import pandas as pd
 import numpy as np
 
+def aggregate_per_second(seconds, **columns):
+    """
+    Per-second mean / sample variance of frame-level values, without a pandas groupby.
+
+    Equivalent to df.groupby("second").agg(name=(column, "mean" | "var")): NaN values are
+    skipped, and a second with no valid value (or a single one, for "var") gives NaN.
+    Seconds are small non-negative-offset integers, so each reduction is an np.bincount.
+
+    Args:
+        seconds (np.ndarray): Integer second of each frame, shape (N,).
+        **columns: name=(values, "mean" | "var") with values of shape (N,).
+
+    Returns:
+        pd.DataFrame: One row per second present (ascending, index named 'second').
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    if len(seconds) == 0:
+        return pd.DataFrame({name: np.array([], dtype=np.float64) for name in columns},
+                            index=pd.Index(seconds, name="second"))
+
+    first = seconds.min()
+    bins = seconds - first
+    n_bins = bins.max() + 1
+    present = np.bincount(bins, minlength=n_bins) > 0
+
+    result = {}
+    for name, (values, how) in columns.items():
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        valid_bins, valid_values = bins[valid], values[valid]
+
+        counts = np.bincount(valid_bins, minlength=n_bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.bincount(valid_bins, weights=valid_values, minlength=n_bins) / counts
+            if how == "var":
+                # Two-pass (centered) variance, ddof=1 like pandas
+                deviations = valid_values - means[valid_bins]
+                squares = np.bincount(valid_bins, weights=deviations * deviations, minlength=n_bins)
+                means = np.where(counts > 1, squares / (counts - 1), np.nan)
+            elif how != "mean":
+                raise ValueError(f"Unsupported aggregation: {how}")
+        result[name] = means[present]
+
+    index = pd.Index(np.flatnonzero(present) + first, name="second")
+    return pd.DataFrame(result, index=index)
+
+def sliding_window_values(seconds, values, window=5):
+    """
+    Mean of every sliding window for one or more metrics sharing the same seconds.
+
+    Only windows spanning window + 1 consecutive seconds are kept. All windows are
+    reduced at once over a strided view of the values instead of slicing per second.
+
+    Args:
+        seconds (np.ndarray): Unique integer seconds, shape (N,).
+        values (np.ndarray): Per-second values, shape (N,) or (N, K) for K metrics.
+        window (int): Window length in seconds (windows span window + 1 seconds).
+
+    Returns:
+        tuple: (starts, means) with starts of shape (W,) and means of shape (W,) or (W, K).
+    """
+    seconds = np.asarray(seconds)
+    values = np.asarray(values, dtype=np.float64)
+    if len(seconds) < window + 1:
+        return seconds[:0], np.empty((0,) + values.shape[1:])
+
+    # Seconds already contiguous and ascending (the usual groupby output):
+    # every window is complete, so window the values in place
+    if np.all(np.diff(seconds) == 1):
+        means = np.lib.stride_tricks.sliding_window_view(values, window + 1, axis=0).mean(axis=-1)
+        return seconds[:len(means)], means
+
+    # Lay the values out on a contiguous second grid so every window is a fixed-size slice
+    grid = np.arange(seconds.min(), seconds.max() + 1)
+    positions = (seconds - grid[0]).astype(np.intp)
+    grid_values = np.full((len(grid),) + values.shape[1:], np.nan)
+    grid_values[positions] = values
+    present = np.zeros(len(grid), dtype=bool)
+    present[positions] = True
+
+    means = np.lib.stride_tricks.sliding_window_view(grid_values, window + 1, axis=0).mean(axis=-1)
+    complete = np.lib.stride_tricks.sliding_window_view(present, window + 1).all(axis=1)
+
+    starts = grid[:len(means)][complete]
+    return starts, means[complete]
+
+
 def project_windows_to_seconds(window_df, total_seconds=None):
     """
     Project overlapping window scores onto a 1Hz timeline (per second).
@@ -26,48 +113,69 @@ def project_windows_to_seconds(window_df, total_seconds=None):
     if window_df.empty:
         return pd.DataFrame()
 
+    # Identify score columns (exclude start/end)
+    score_cols = [c for c in window_df.columns if c not in ["start_sec", "end_sec"]]
+
+    return project_window_values(
+        window_df["start_sec"].to_numpy(),
+        window_df["end_sec"].to_numpy(),
+        window_df[score_cols].to_numpy(dtype=np.float64),
+        score_cols,
+        total_seconds=total_seconds
+    )
+
+
+def project_window_values(starts, ends, values, columns, total_seconds=None):
+    """
+    Array version of project_windows_to_seconds.
+
+    Windows cover [start, end): a 5s window 0-5 covers seconds 0, 1, 2, 3, 4.
+    Each window is expanded into the seconds it covers and the per-second sums are
+    accumulated with np.bincount, so no per-second DataFrame filtering is needed.
+    NaN values are skipped; seconds with no (non-NaN) window value are NaN.
+
+    Args:
+        starts (np.ndarray): Window start seconds, shape (W,).
+        ends (np.ndarray): Window end seconds (exclusive), shape (W,).
+        values (np.ndarray): Window values, shape (W, K).
+        columns (list): Names of the K value columns.
+        total_seconds (int, optional): Total duration of the video in seconds.
+                                       If None, inferred from max(end_sec).
+
+    Returns:
+        pd.DataFrame: Timeline DataFrame with 'second' and averaged values.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64).reshape(len(starts), -1)
+
+    if len(starts) == 0:
+        return pd.DataFrame()
+
     # Determine duration
-    max_end = int(window_df["end_sec"].max())
+    max_end = int(ends.max())
     if total_seconds is None:
         duration = max_end
     else:
         duration = max(total_seconds, max_end)
 
-    # Identify score columns (exclude start/end)
-    score_cols = [c for c in window_df.columns if c not in ["start_sec", "end_sec"]]
-
-    timeline_data = []
-
-    for t in range(duration):
-        # Find windows active at second t (start <= t < end)
-        # Note: Windows are typically [start, end).
-        # Adjust logic if your windows are inclusive/exclusive differently.
-        # Assuming standard 5s window: 0-5 covers 0, 1, 2, 3, 4.
-        active_windows = window_df[
-            (window_df["start_sec"] <= t) &
-            (window_df["end_sec"] > t)
-        ]
-
-        row = {"second": t}
-
-        if not active_windows.empty:
-            # Calculate mean for all score columns
-            for col in score_cols:
-                row[col] = active_windows[col].mean()
-        else:
-            # No windows cover this second (e.g., end of video padding)
-            # Forward fill or leave as NaN?
-            # For now, leave as NaN or 0?
-            # Better to leave as NaN and handle later, or fill with 0 if appropriate.
-            # Let's use NaN to indicate "no data".
-            for col in score_cols:
-                row[col] = np.nan
-
-        timeline_data.append(row)
-
-    timeline_df = pd.DataFrame(timeline_data)
-
-    # Optional: Interpolate missing values if needed
-    # timeline_df = timeline_df.interpolate(method='linear').fillna(method='bfill').fillna(method='ffill')
-
-    return timeline_df
+    # Expand windows into (second, window) pairs, window-major
+    lengths = np.maximum(ends - starts, 0)
+    window_idx = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.arange(len(window_idx)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    seconds = starts[window_idx] + offsets
+
+    in_range = (seconds >= 0) & (seconds < duration)
+    window_idx = window_idx[in_range]
+    seconds = seconds[in_range]
+
+    timeline = {"second": np.arange(duration)}
+    for k, col in enumerate(columns):
+        col_values = values[window_idx, k]
+        valid = ~np.isnan(col_values)
+        sums = np.bincount(seconds, weights=np.where(valid, col_values, 0.0), minlength=duration)
+        counts = np.bincount(seconds, weights=valid, minlength=duration)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            timeline[col] = np.where(counts > 0, sums / counts, np.nan)
+
+    return pd.DataFrame(timeline)
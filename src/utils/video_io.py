@@ -0,0 +1,187 @@
+"""
+Video I/O Utilities.
+
+Background-thread frame reading and writing, so decoding and encoding overlap
+with the per-frame work of the caller (OpenCV releases the GIL while it decodes
+and encodes), and a single-pass H.264 writer that pipes frames into ffmpeg.
+"""
+
+import os
+import subprocess
+import threading
+from queue import Queue, Empty, Full
+
+import cv2
+import imageio_ffmpeg
+
+def _put(queue, item, stop):
+    # Blocking put that gives up once the consumer has gone away
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+def read_frames(cap, frame_count, prefetch=8, stride=1):
+    """
+    Yield up to frame_count frames from an opened cv2.VideoCapture.
+
+    Frames are decoded ahead on a background thread into a bounded queue. Stops at
+    the first failed read, like a `ret, frame = cap.read(); if not ret: break` loop.
+    With stride > 1 only every stride-th frame (0, stride, 2*stride, ...) is decoded;
+    the others are only grabbed.
+    """
+    queue = Queue(maxsize=prefetch)
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        try:
+            for idx in range(frame_count):
+                if idx % stride:
+                    if not cap.grab():
+                        break
+                    continue
+                ret, frame = cap.read()
+                if not ret or not _put(queue, frame, stop):
+                    break
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _put(queue, None, stop)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            frame = queue.get()
+            if frame is None:
+                break
+            yield frame
+    finally:
+        stop.set()
+        thread.join()
+    if errors:
+        raise errors[0]
+
+class FrameWriter:
+    """
+    Write frames to a cv2.VideoWriter from a background thread.
+
+    write() only enqueues the frame (bounded queue); close() flushes the queue,
+    releases the writer and re-raises any error from the writer thread (or from
+    releasing the writer).
+    """
+
+    def __init__(self, writer, maxsize=8):
+        self.writer = writer
+        self.queue = Queue(maxsize=maxsize)
+        self.stop = threading.Event()
+        self.errors = []
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                frame = self.queue.get(timeout=0.1)
+            except Empty:
+                if self.stop.is_set():
+                    return
+                continue
+            if frame is None:
+                return
+            try:
+                self.writer.write(frame)
+            except Exception as e:
+                self.errors.append(e)
+                self.stop.set()
+                return
+
+    def write(self, frame):
+        # After a writer error, frames are dropped; the error is raised by close()
+        _put(self.queue, frame, self.stop)
+
+    def close(self):
+        _put(self.queue, None, self.stop)
+        self.thread.join()
+        # An error from release() (e.g. the encoder's own message) is the most telling
+        try:
+            self.writer.release()
+        except Exception as e:
+            self.errors.append(e)
+        if self.errors:
+            raise self.errors[-1]
+
+    def abort(self):
+        """
+        Stop without flushing, e.g. when drawing failed: queued frames are dropped and
+        the writer is aborted (or released when it has no abort()). Errors are ignored.
+        """
+        self.stop.set()
+        abort = getattr(self.writer, "abort", None)
+        if abort is not None:
+            # Kill the encoder first so a write blocked on it returns
+            abort()
+        self.thread.join()
+        if abort is None:
+            try:
+                self.writer.release()
+            except Exception:
+                pass
+
+class FFmpegWriter:
+    """
+    cv2.VideoWriter-like writer that pipes raw BGR frames into ffmpeg and encodes
+    H.264 (browser compatible) in a single pass.
+    """
+
+    def __init__(self, output_path, fps, width, height, ffmpeg_exe=None):
+        ffmpeg_exe = ffmpeg_exe or imageio_ffmpeg.get_ffmpeg_exe()
+        self.output_path = output_path
+        self.proc = subprocess.Popen([
+            ffmpeg_exe, "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24",
+            "-s", f"{width}x{height}", "-r", str(fps),
+            "-i", "-",
+            # yuv420p needs even dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-vcodec", "libx264", "-pix_fmt", "yuv420p",
+            "-crf", "23",
+            output_path
+        ], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    def write(self, frame):
+        self.proc.stdin.write(frame.tobytes())
+
+    def release(self):
+        _, stderr = self.proc.communicate()
+        if self.proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed to encode {self.output_path}: {stderr.decode(errors='replace').strip()}")
+
+    def abort(self):
+        # Kill ffmpeg and remove the partial output
+        self.proc.kill()
+        self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stderr):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+def open_h264_writer(output_path, fps, width, height):
+    """
+    Open an FFmpegWriter, falling back to an mp4v cv2.VideoWriter when ffmpeg
+    cannot be started.
+    """
+    try:
+        return FFmpegWriter(output_path, fps, width, height)
+    except Exception as e:
+        print(f"⚠️ ffmpeg unavailable, writing mp4v instead: {e}")
+        return cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+
+from src.body import visualization
+from src.utils.video_io import read_frames
+from video_fixtures import write_blank_video
+
+class BrokenEncoder:
+    # Stands in for an ffmpeg process that died mid-stream
+    def write(self, frame):
+        raise BrokenPipeError("encoder exited")
+
+    def release(self):
+        raise RuntimeError("ffmpeg failed to encode")
+
+class TestBodyVisualization(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "blank.mp4")
+        write_blank_video(self.video_path, n_frames=20)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_falls_back_to_mp4v_when_encoding_fails(self):
+        output_path = os.path.join(self.tmp_dir, "debug.mp4")
+        with mock.patch.object(visualization, "open_h264_writer", return_value=BrokenEncoder()):
+            visualization.create_debug_video(self.video_path, output_path, pose_landmarks=[None] * 20)
+
+        cap = cv2.VideoCapture(output_path)
+        self.assertEqual(len(list(read_frames(cap, 100))), 20)
+        cap.release()
+
+    def test_draw_error_stops_the_encoder(self):
+        output_path = os.path.join(self.tmp_dir, "debug.mp4")
+        writers = []
+        open_h264_writer = visualization.open_h264_writer
+        def open_writer(*args):
+            writers.append(open_h264_writer(*args))
+            return writers[-1]
+
+        with mock.patch.object(visualization, "open_h264_writer", side_effect=open_writer), \
+                mock.patch.object(visualization, "_draw_video", side_effect=RuntimeError("decode error")):
+            with self.assertRaises(RuntimeError):
+                visualization.create_debug_video(self.video_path, output_path, pose_landmarks=[])
+
+        proc = getattr(writers[0], "proc", None)
+        if proc is not None:
+            self.assertIsNotNone(proc.poll())
+            self.assertFalse(os.path.exists(output_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.face import extraction
+from video_fixtures import write_blank_video
+
+class TestFaceExtraction(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "blank.mp4")
+        write_blank_video(self.video_path)
+
+    def tearDown(self):
+        extraction.close_face_mesh()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_face_mesh_reused_and_closed(self):
+        df = extraction.process_video(self.video_path)
+        face_mesh = extraction._FACE_MESH
+        self.assertIsNotNone(face_mesh)
+        self.assertTrue(extraction.process_video(self.video_path).equals(df))
+        self.assertIs(extraction._FACE_MESH, face_mesh)
+
+        extraction.close_face_mesh()
+        self.assertIsNone(extraction._FACE_MESH)
+        # Closing twice is a no-op, and the next video gets a new FaceMesh
+        extraction.close_face_mesh()
+        self.assertTrue(extraction.process_video(self.video_path).equals(df))
+        self.assertIsNotNone(extraction._FACE_MESH)
+
+    def test_threads_share_one_face_mesh(self):
+        # Sequential runs from new threads (e.g. one per app rerun) reuse the same
+        # FaceMesh instead of keeping one per thread
+        extraction.process_video(self.video_path)
+        face_mesh = extraction._FACE_MESH
+        for _ in range(3):
+            thread = threading.Thread(target=extraction.process_video, args=(self.video_path,))
+            thread.start()
+            thread.join()
+        self.assertIs(extraction._FACE_MESH, face_mesh)
+
+    def test_concurrent_run_uses_temporary_face_mesh(self):
+        expected = extraction.process_video(self.video_path)
+        # While the shared FaceMesh is busy, another run still completes
+        with extraction._face_mesh():
+            self.assertTrue(extraction.process_video(self.video_path).equals(expected))
+
+    def test_invalid_stride(self):
+        for stride in (0, -2, 1.5):
+            with self.assertRaises(ValueError):
+                extraction.process_video(self.video_path, stride=stride)
+
+    def test_process_videos_after_parent_run(self):
+        # The parent already holds a FaceMesh: workers must not inherit it
+        expected = extraction.process_video(self.video_path)
+        results = extraction.process_videos([self.video_path, self.video_path], workers=2)
+        self.assertEqual(len(results), 2)
+        for df in results:
+            self.assertTrue(df.equals(expected))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.face.geometry import MOTION_LANDMARKS, compute_face_motion
+
+def fake_landmarks(rng):
+    return [SimpleNamespace(x=x, y=y, z=z) for x, y, z in rng.uniform(0, 1, (478, 3))]
+
+# Per-frame reference versions of the motion metrics
+def landmark(lm, i):
+    return np.array([lm[i].x, lm[i].y, lm[i].z])
+
+def compute_head_center(lm):
+    return (landmark(lm, 234) + landmark(lm, 454)) / 2
+
+def compute_iris_centers(lm):
+    return (landmark(lm, 468) + landmark(lm, 473)) / 2
+
+def compute_inter_ocular_distance(lm):
+    return np.linalg.norm(landmark(lm, 468) - landmark(lm, 473))
+
+def compute_face_center(lm):
+    return landmark(lm, 1)
+
+def compute_smile_activation(lm):
+    return np.linalg.norm(landmark(lm, 61) - landmark(lm, 291))
+
+class TestFaceGeometry(unittest.TestCase):
+
+    def test_face_motion_matches_per_frame_helpers(self):
+        rng = np.random.default_rng(0)
+        fps = 30.0
+        frames = [fake_landmarks(rng) for _ in range(5)]
+        points = np.array([[(lm[i].x, lm[i].y, lm[i].z) for i in MOTION_LANDMARKS] for lm in frames])
+        head_speed, gaze_dg, smile = compute_face_motion(points, fps)
+
+        # First frame has no previous face
+        self.assertTrue(np.isnan(head_speed[0]) and np.isnan(gaze_dg[0]))
+        for t in range(1, len(frames)):
+            prev, lm = frames[t - 1], frames[t]
+            iod = compute_inter_ocular_distance(lm)
+            expected_speed = np.linalg.norm(compute_head_center(lm) - compute_head_center(prev)) / iod * fps
+            self.assertAlmostEqual(head_speed[t], expected_speed, places=9)
+
+            gaze = [compute_iris_centers(f) - compute_face_center(f) for f in (prev, lm)]
+            gaze = [g / (np.linalg.norm(g) + 1e-6) for g in gaze]
+            self.assertAlmostEqual(gaze_dg[t], np.linalg.norm(gaze[1] - gaze[0]) * fps, places=9)
+            self.assertAlmostEqual(smile[t], compute_smile_activation(lm) / iod, places=12)
+
+    def test_face_motion_zero_iod(self):
+        points = np.random.default_rng(1).uniform(0, 1, (2, len(MOTION_LANDMARKS), 3))
+        points[1, 3] = points[1, 2]  # irises coincide
+        head_speed, _, smile = compute_face_motion(points, 30.0)
+        self.assertEqual(head_speed[1], 0.0)
+        self.assertEqual(smile[1], 0.0)
+
+    def test_face_motion_empty(self):
+        head_speed, gaze_dg, smile = compute_face_motion(np.empty((0, len(MOTION_LANDMARKS), 3)), 30.0)
+        self.assertEqual((len(head_speed), len(gaze_dg), len(smile)), (0, 0, 0))
+
+if __name__ == '__main__':
+    unittest.main()
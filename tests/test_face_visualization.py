@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from src.face import visualization
+from src.face.config import DEBUG_POINTS, COLOR_SMILE
+from video_fixtures import FakeWriter, write_blank_video
+
+class TestFaceVisualization(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.video_path = os.path.join(self.tmp_dir, "blank.mp4")
+        write_blank_video(self.video_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def render(self, face_landmarks, stride):
+        writer = FakeWriter()
+        output_path = os.path.join(self.tmp_dir, "debug.mp4")
+        with mock.patch.object(visualization.cv2, "VideoWriter", return_value=writer):
+            visualization.create_debug_video(self.video_path, output_path, face_landmarks, stride=stride)
+        return writer.frames
+
+    def test_cached_landmarks_follow_stride(self):
+        # 30 frames at stride 4 -> 8 analyzed frames, a face on every other one
+        face_landmarks = np.full((8, len(DEBUG_POINTS), 2), np.nan, dtype=np.float32)
+        face_landmarks[::2] = 0.5
+        frames = self.render(face_landmarks, stride=4)
+
+        self.assertEqual(len(frames), 30)
+        # Every keypoint sits at the frame center, the smile points are drawn last
+        drawn = [tuple(frame[24, 32]) == COLOR_SMILE for frame in frames]
+        self.assertEqual(drawn, [(idx // 4) % 2 == 0 for idx in range(30)])
+
+    def test_short_landmarks_are_reused(self):
+        # Extraction stopped early: frames past the last row are drawn without a face
+        face_landmarks = np.full((10, len(DEBUG_POINTS), 2), 0.5, dtype=np.float32)
+        with mock.patch.object(visualization.mp.solutions.face_mesh, "FaceMesh") as face_mesh:
+            frames = self.render(face_landmarks, stride=1)
+        face_mesh.assert_not_called()
+        drawn = [tuple(frame[24, 32]) == COLOR_SMILE for frame in frames]
+        self.assertEqual(drawn, [idx < 10 for idx in range(30)])
+
+if __name__ == '__main__':
+    unittest.main()
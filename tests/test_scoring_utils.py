@@ -5,7 +5,20 @@ import os
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from src.utils.scoring_utils import compute_tiered_score
+import numpy as np
+import pandas as pd
+
+from src.utils.scoring_utils import (
+    compute_tiered_score,
+    compute_tiered_scores,
+    build_tiered_tables,
+    build_interpretation_lookup,
+    lookup_interpretation,
+    CHANGE_LABELS,
+    compute_delta_codes,
+    score_windows,
+    memoize_by_frame
+)
 
 class TestScoringUtils(unittest.TestCase):
 
@@ -84,5 +97,85 @@ class TestScoringUtils(unittest.TestCase):
         score_mid = compute_tiered_score(520, self.config) # Approx mid
         self.assertAlmostEqual(score_mid, 0.2, places=1)
 
+    def test_vectorized_matches_scalar(self):
+        # Array version must agree with the scalar version on every bucket,
+        # including boundaries and the open-ended (999) bucket
+        values = np.array([-1, 0, 5, 10, 10.01, 15, 20, 22.5, 25, 30, 35, 40, 40.01, 520, 999, 1000])
+        expected = [compute_tiered_score(v, self.config) for v in values]
+        np.testing.assert_allclose(compute_tiered_scores(values, self.config), expected, rtol=1e-12)
+
+    def test_vectorized_writes_into_out(self):
+        values = np.array([5.0, 15.0, 25.0])
+        out = np.empty(3)
+        result = compute_tiered_scores(values, self.config, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(out, [0.2, 0.6, 1.0], atol=1e-9)
+
+    def test_vectorized_prebuilt_tables(self):
+        # Prebuilt tables must score exactly like passing the buckets
+        values = np.array([-1, 5, 10, 22.5, 30, 520, 1000])
+        tables = build_tiered_tables(self.config)
+        np.testing.assert_array_equal(
+            compute_tiered_scores(values, tables=tables),
+            compute_tiered_scores(values, self.config)
+        )
+
+    def test_interpretation_lookup(self):
+        # First bucket with value <= max wins (inclusive max), NaN matches nothing
+        ranges = {
+            "metric": [dict(b, text=b["label"], coaching="") for b in self.config],
+            "global": [(0.7, 1.0, "good"), (0.0, 0.7, "bad")]
+        }
+        lookup = build_interpretation_lookup(ranges)
+        self.assertNotIn("global", lookup)
+        self.assertEqual(lookup_interpretation(lookup, "metric", 10)[2], "low")
+        self.assertEqual(lookup_interpretation(lookup, "metric", 10.01)[2], "mid")
+        self.assertEqual(lookup_interpretation(lookup, "metric", 500)[2], "very_high")
+        self.assertEqual(lookup_interpretation(lookup, "metric", 1000)[2], "unknown")
+        self.assertEqual(lookup_interpretation(lookup, "metric", float("nan"))[2], "unknown")
+        self.assertEqual(lookup_interpretation(lookup, "missing", 1)[2], "unknown")
+
+        # Array input resolves every value at once, same buckets as the scalar path
+        values = np.array([10, 10.01, 500, 1000, np.nan])
+        texts, coachings, labels = lookup_interpretation(lookup, "metric", values)
+        self.assertEqual(labels.tolist(), ["low", "mid", "very_high", "unknown", "unknown"])
+        self.assertEqual(texts.tolist(), [lookup_interpretation(lookup, "metric", v)[0] for v in values])
+        self.assertEqual(lookup_interpretation(lookup, "missing", values)[2].tolist(), ["unknown"] * 5)
+
+    def test_score_windows_change_labels(self):
+        # 8 seconds -> 3 windows; window means 2.5, 3.5, 4.5 with a flat metric alongside
+        raw_1s_df = pd.DataFrame({"second": np.arange(8), "a": np.arange(8.0), "b": np.ones(8)})
+        tables = {m: build_tiered_tables(self.config) for m in ("a", "b")}
+        window_df, window_scores = score_windows(raw_1s_df, [("a", "a"), ("b", "b")], tables, {})
+        self.assertEqual(window_scores.shape, (2, 3))
+
+        # Labels are Categorical but hold the same strings (last window has no delta)
+        self.assertEqual(window_df["a_change_label"].dtype, "category")
+        self.assertEqual(window_df["a_change_label"].tolist(), ["erratic", "erratic", ""])
+        self.assertEqual(window_df["b_change_label"].tolist(), ["stable", "stable", ""])
+        _, codes = compute_delta_codes(window_df["a_val"])
+        self.assertEqual(CHANGE_LABELS[codes].tolist(), window_df["a_change_label"].tolist()[:-1])
+
+    def test_memoize_by_frame(self):
+        calls = []
+
+        @memoize_by_frame(maxsize=2)
+        def summarize(df):
+            calls.append(1)
+            return {"total": float(df["a"].sum())}, df.assign(b=df["a"] * 2)
+
+        df = pd.DataFrame({"a": [1.0, 2.0, np.nan]})
+        first = summarize(df)
+        first[0]["total"] = -1.0  # mutating a result must not leak into the cache
+        second = summarize(df.copy())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second[0]["total"], 3.0)
+        pd.testing.assert_frame_equal(first[1], second[1])
+
+        # Different content (or dtype) is a cache miss
+        summarize(pd.DataFrame({"a": [1.0, 2.0, 4.0]}))
+        summarize(df.astype(np.float32))
+        self.assertEqual(len(calls), 3)
+
 if __name__ == '__main__':
     unittest.main()
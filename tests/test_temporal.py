@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+
+from src.utils.temporal import (
+    aggregate_per_second,
+    sliding_window_values,
+    project_windows_to_seconds
+)
+
+class TestTemporal(unittest.TestCase):
+
+    def test_sliding_window_values_contiguous(self):
+        # 8 seconds -> windows 0-5, 1-6, 2-7 (each spans window + 1 seconds)
+        starts, means = sliding_window_values(np.arange(8), np.arange(8, dtype=float))
+        self.assertEqual(starts.tolist(), [0, 1, 2])
+        np.testing.assert_allclose(means, [2.5, 3.5, 4.5])
+
+    def test_sliding_window_values_skip_gaps(self):
+        # Seconds 6-7 are missing: only windows fully inside 0-5 and 8-14 are kept
+        seconds = np.array([0, 1, 2, 3, 4, 5, 8, 9, 10, 11, 12, 13, 14])
+        starts, means = sliding_window_values(seconds, np.ones(len(seconds)))
+        self.assertEqual(starts.tolist(), [0, 8, 9])
+        np.testing.assert_allclose(means, 1.0)
+
+    def test_sliding_window_values_too_short(self):
+        starts, means = sliding_window_values(np.arange(5), np.ones(5))
+        self.assertEqual((len(starts), len(means)), (0, 0))
+
+    def test_sliding_window_values_matrix(self):
+        # Columns are windowed independently, same as one metric each
+        values = np.column_stack([np.arange(8.0), np.arange(8.0) ** 2])
+        starts, means = sliding_window_values(np.arange(8), values)
+        self.assertEqual(means.shape, (3, 2))
+        for col in range(2):
+            _, expected = sliding_window_values(np.arange(8), values[:, col])
+            np.testing.assert_array_equal(means[:, col], expected)
+        np.testing.assert_array_equal(starts, [0, 1, 2])
+
+    def test_aggregate_per_second_matches_groupby(self):
+        rng = np.random.default_rng(0)
+        # Unsorted seconds with a gap (no frames in second 4), NaNs, an all-NaN second
+        # and a single-frame second (variance undefined)
+        seconds = rng.permutation(np.r_[np.repeat([0, 1, 2, 3, 5, 6], 30), 7])
+        df = pd.DataFrame({"second": seconds, "x": rng.normal(size=len(seconds))})
+        df.loc[df.sample(frac=0.2, random_state=0).index, "x"] = np.nan
+        df.loc[df["second"] == 2, "x"] = np.nan
+
+        result = aggregate_per_second(
+            df["second"].to_numpy(),
+            x_mean=(df["x"].to_numpy(), "mean"),
+            x_var=(df["x"].to_numpy(), "var")
+        )
+        expected = df.groupby("second").agg(x_mean=("x", "mean"), x_var=("x", "var"))
+        pd.testing.assert_frame_equal(result, expected, rtol=1e-12)
+
+    def test_project_windows_to_seconds(self):
+        window_df = pd.DataFrame({
+            "start_sec": [0, 1, 5],
+            "end_sec": [5, 6, 10],
+            "a_val": [1.0, 3.0, np.nan]
+        })
+        timeline = project_windows_to_seconds(window_df, total_seconds=12)
+        self.assertEqual(timeline["second"].tolist(), list(range(12)))
+        # Second 0 -> window 0 only, 1-4 -> windows 0 and 1, 5 -> window 1 (window 2 is NaN)
+        np.testing.assert_allclose(timeline["a_val"][:6], [1.0, 2.0, 2.0, 2.0, 2.0, 3.0])
+        # No (non-NaN) window covers seconds 6-11
+        self.assertTrue(timeline["a_val"][6:].isna().all())
+
+if __name__ == '__main__':
+    unittest.main()
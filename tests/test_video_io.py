@@ -0,0 +1,131 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import imageio_ffmpeg
+import numpy as np
+
+from src.utils.video_io import read_frames, FrameWriter, FFmpegWriter
+from video_fixtures import FakeWriter, FailingWriter
+
+class FakeCapture:
+    def __init__(self, n):
+        self.n = n
+        self.i = 0
+        self.decoded = 0
+
+    def grab(self):
+        if self.i >= self.n:
+            return False
+        self.i += 1
+        return True
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        self.decoded += 1
+        return True, self.i
+
+class TestVideoIO(unittest.TestCase):
+
+    def test_read_frames_in_order(self):
+        self.assertEqual(list(read_frames(FakeCapture(20), 20, prefetch=2)), list(range(1, 21)))
+
+    def test_read_frames_stops_at_failed_read(self):
+        # Capture runs out before frame_count, like a truncated video
+        self.assertEqual(list(read_frames(FakeCapture(3), 10)), [1, 2, 3])
+
+    def test_read_frames_stride(self):
+        cap = FakeCapture(10)
+        self.assertEqual(list(read_frames(cap, 10, stride=3)), [1, 4, 7, 10])
+        self.assertEqual(cap.decoded, 4)
+
+    def test_read_frames_early_exit(self):
+        frames = read_frames(FakeCapture(100), 100, prefetch=2)
+        self.assertEqual(next(frames), 1)
+        frames.close()
+
+    def test_frame_writer_flushes_on_close(self):
+        fake = FakeWriter()
+        writer = FrameWriter(fake, maxsize=2)
+        for i in range(50):
+            writer.write(i)
+        writer.close()
+        self.assertEqual(fake.frames, list(range(50)))
+        self.assertTrue(fake.released)
+
+    def test_frame_writer_error_raised_on_close(self):
+        fake = FailingWriter()
+        writer = FrameWriter(fake, maxsize=2)
+        for i in range(10):
+            writer.write(i)  # frames after the failure are dropped, not raised
+        with self.assertRaises(BrokenPipeError):
+            writer.close()
+        self.assertTrue(fake.released)
+
+    def test_ffmpeg_writer_encodes_h264(self):
+        try:
+            ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            self.skipTest("ffmpeg not available")
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        output_path = os.path.join(tmp_dir, "out.mp4")
+
+        # Odd dimensions are padded to even ones for yuv420p
+        writer = FFmpegWriter(output_path, 30, 33, 21, ffmpeg_exe=ffmpeg_exe)
+        for i in range(12):
+            writer.write(np.full((21, 33, 3), i * 20, dtype=np.uint8))
+        writer.release()
+
+        cap = cv2.VideoCapture(output_path)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 34)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), 22)
+        self.assertEqual(len(list(read_frames(cap, 100))), 12)
+        cap.release()
+
+    def test_ffmpeg_writer_failure_raised_on_close(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        # The Python interpreter rejects ffmpeg's arguments and exits non-zero right
+        # away, so the writes hit a broken pipe
+        writer = FrameWriter(FFmpegWriter(
+            os.path.join(tmp_dir, "out.mp4"), 30, 320, 240, ffmpeg_exe=sys.executable
+        ))
+        for _ in range(20):
+            writer.write(np.zeros((240, 320, 3), dtype=np.uint8))
+        with self.assertRaises(RuntimeError):
+            writer.close()
+
+    def test_frame_writer_abort(self):
+        fake = FakeWriter()
+        writer = FrameWriter(fake)
+        writer.write(1)
+        writer.abort()
+        self.assertFalse(writer.thread.is_alive())
+        self.assertTrue(fake.released)
+
+    def test_ffmpeg_writer_abort(self):
+        try:
+            ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            self.skipTest("ffmpeg not available")
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        output_path = os.path.join(tmp_dir, "out.mp4")
+
+        ffmpeg = FFmpegWriter(output_path, 30, 32, 24, ffmpeg_exe=ffmpeg_exe)
+        writer = FrameWriter(ffmpeg)
+        writer.write(np.zeros((24, 32, 3), dtype=np.uint8))
+        writer.abort()
+        self.assertIsNotNone(ffmpeg.proc.poll())
+        self.assertFalse(os.path.exists(output_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+"""
+Shared fixtures for the video tests: a blank test video and fake cv2.VideoWriters.
+"""
+
+import cv2
+import numpy as np
+
+def write_blank_video(path, n_frames=30, fps=30.0, size=(64, 48)):
+    # Black mp4v video (no face or pose to detect)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    for _ in range(n_frames):
+        writer.write(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+    writer.release()
+
+class FakeWriter:
+    def __init__(self):
+        self.frames = []
+        self.released = False
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+    def release(self):
+        self.released = True
+
+class FailingWriter(FakeWriter):
+    def write(self, frame):
+        raise BrokenPipeError("encoder exited")